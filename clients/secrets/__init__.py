@@ -25,17 +25,19 @@ Security guarantees:
 """
 
 import logging
+import threading
 from pathlib import Path
 from typing import Optional
 
 from .backend import SecretsBackend
-from .schema import SchemaError, get_required_fields, validate
+from .schema import SchemaError, compile_schema, get_required_fields, validate
 from .sops_backend import SOPSBackend
 
 logger = logging.getLogger(__name__)
 
 # Global singleton instance
 _secrets_backend: Optional[SOPSBackend] = None
+_backend_lock = threading.Lock()
 
 
 def create_backend(
@@ -68,7 +70,8 @@ def get_secrets_backend() -> SOPSBackend:
     """
     Get the global secrets backend singleton.
 
-    Initializes on first call. Thread-safe for reads after initialization.
+    Initializes on first call under a lock so concurrent callers share one
+    backend; once initialized, calls return without locking.
     Raises on any configuration or security error.
 
     Returns:
@@ -79,10 +82,16 @@ def get_secrets_backend() -> SOPSBackend:
     """
     global _secrets_backend
 
-    if _secrets_backend is None:
-        _secrets_backend = create_backend()
-        _secrets_backend.init()
-        logger.info("Secrets backend initialized successfully")
+    backend = _secrets_backend
+    if backend is not None:
+        return backend
+
+    with _backend_lock:
+        if _secrets_backend is None:
+            backend = create_backend()
+            backend.init()
+            _secrets_backend = backend
+            logger.info("Secrets backend initialized successfully")
 
     return _secrets_backend
 
@@ -115,6 +124,7 @@ __all__ = [
     "initialize_secrets",
     # Utilities
     "validate",
+    "compile_schema",
     "get_required_fields",
 ]
 
@@ -20,6 +20,9 @@ class SecretsBackend(abc.ABC):
     - is_ready() indicates whether init() completed successfully
     """
 
+    # Empty so subclasses can declare __slots__ without regaining a __dict__
+    __slots__ = ()
+
     @abc.abstractmethod
     def init(self) -> None:
         """
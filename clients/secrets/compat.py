@@ -14,17 +14,16 @@ Usage:
 The function signatures and return values are identical.
 """
 
+import functools
 import logging
-from typing import Any, Dict
+from types import MappingProxyType
+from typing import Any, Dict, Mapping
 
 from . import get_secrets_backend
 
 logger = logging.getLogger(__name__)
 
-# Cache for compatibility with vault_client behavior
-_secret_cache: Dict[str, str] = {}
-
-
+@functools.lru_cache(maxsize=None)
 def get_database_url(service: str, admin: bool = False) -> str:
     """
     Get database URL for a service.
@@ -40,17 +39,10 @@ def get_database_url(service: str, admin: bool = False) -> str:
         raise ValueError(f"Unknown database service: '{service}'. Only 'mira_service' is supported.")
 
     field = "admin_url" if admin else "service_url"
-    cache_key = f"database/{field}"
-
-    if cache_key in _secret_cache:
-        return _secret_cache[cache_key]
-
-    backend = get_secrets_backend()
-    value = backend.get(f"database.{field}")
-    _secret_cache[cache_key] = value
-    return value
+    return get_secrets_backend().get(f"database.{field}")
 
 
+@functools.lru_cache(maxsize=None)
 def get_api_key(key_name: str) -> str:
     """
     Get API key by name.
@@ -61,23 +53,15 @@ def get_api_key(key_name: str) -> str:
     Returns:
         The API key value
     """
-    cache_key = f"providers/{key_name}"
-
-    if cache_key in _secret_cache:
-        return _secret_cache[cache_key]
-
     backend = get_secrets_backend()
 
     # Handle auth keys vs provider keys
     if key_name in ("mira_api", "jwt_secret"):
-        value = backend.get(f"auth.{key_name}")
-    else:
-        value = backend.get(f"providers.{key_name}")
-
-    _secret_cache[cache_key] = value
-    return value
+        return backend.get(f"auth.{key_name}")
+    return backend.get(f"providers.{key_name}")
 
 
+@functools.lru_cache(maxsize=None)
 def get_auth_secret(secret_name: str) -> str:
     """
     Get authentication secret by name.
@@ -88,17 +72,10 @@ def get_auth_secret(secret_name: str) -> str:
     Returns:
         The secret value
     """
-    cache_key = f"auth/{secret_name}"
-
-    if cache_key in _secret_cache:
-        return _secret_cache[cache_key]
-
-    backend = get_secrets_backend()
-    value = backend.get(f"auth.{secret_name}")
-    _secret_cache[cache_key] = value
-    return value
+    return get_secrets_backend().get(f"auth.{secret_name}")
 
 
+@functools.lru_cache(maxsize=None)
 def get_service_config(service: str, field: str) -> str:
     """
     Get service configuration value.
@@ -110,52 +87,48 @@ def get_service_config(service: str, field: str) -> str:
     Returns:
         The configuration value
     """
-    cache_key = f"services/{field}"
-
-    if cache_key in _secret_cache:
-        return _secret_cache[cache_key]
+    return get_secrets_backend().get(f"services.{field}")
 
-    backend = get_secrets_backend()
-    value = backend.get(f"services.{field}")
-    _secret_cache[cache_key] = value
-    return value
 
-
-def get_database_credentials() -> Dict[str, str]:
+@functools.lru_cache(maxsize=None)
+def get_database_credentials() -> Mapping[str, str]:
     """
     Get database username and password.
 
     Returns:
-        Dictionary with 'username' and 'password' keys
+        Read-only mapping with 'username' and 'password' keys (the cached
+        object is shared between callers)
     """
     backend = get_secrets_backend()
-    return {
+    return MappingProxyType({
         "username": backend.get("database.username"),
         "password": backend.get("database.password"),
-    }
+    })
+
+
+def clear_secret_cache() -> None:
+    """Drop memoized lookups so the next calls read the current backend."""
+    for getter in (
+        get_database_url,
+        get_api_key,
+        get_auth_secret,
+        get_service_config,
+        get_database_credentials,
+    ):
+        getter.cache_clear()
 
 
 def preload_secrets() -> None:
     """
-    Preload all secrets into memory cache.
+    Initialize the secrets backend so all secrets are decrypted in memory.
 
-    With SOPS backend, secrets are already loaded and cached at init().
-    This function exists for API compatibility with vault_client.
+    Clears memoized lookups first so they are re-read from the freshly
+    initialized backend. This function exists for API compatibility with
+    vault_client.
     """
-    backend = get_secrets_backend()
-    all_secrets = backend.get_all()
-
-    # Flatten nested secrets into cache format
-    def flatten(d: Dict[str, Any], prefix: str = "") -> None:
-        for key, value in d.items():
-            full_key = f"{prefix}/{key}" if prefix else key
-            if isinstance(value, dict):
-                flatten(value, full_key)
-            else:
-                _secret_cache[full_key] = value
-
-    flatten(all_secrets)
-    logger.info(f"Preloaded {len(_secret_cache)} secrets into cache")
+    clear_secret_cache()
+    get_secrets_backend()
+    logger.info("Secrets preloaded into memory")
 
 
 def test_vault_connection() -> Dict[str, Any]:
@@ -167,8 +140,10 @@ def test_vault_connection() -> Dict[str, Any]:
     """
     try:
         backend = get_secrets_backend()
-        # Try reading a required secret to verify
-        backend.get("database.username")
+        # init() already validated every required secret against the schema,
+        # so a ready backend needs no per-probe secret read
+        if not backend.is_ready():
+            raise RuntimeError("Secrets backend not initialized")
 
         return {
             "status": "success",
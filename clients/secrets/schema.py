@@ -3,9 +3,12 @@ Schema validation engine for SOPS secrets.
 
 Validates decrypted secrets against a YAML schema with fail-fast semantics.
 Collects ALL errors before raising, so operators can fix everything at once.
+
+A schema is compiled once into a flat plan of nodes in document order, so
+validation is a single pass with no recursion or repeated subtree scans.
 """
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, NamedTuple, Optional
 
 
 class SchemaError(Exception):
@@ -13,94 +16,135 @@ class SchemaError(Exception):
     pass
 
 
-def validate(
-    schema: Dict[str, Any],
-    secrets: Dict[str, Any],
-    path: str = "",
-    errors: Optional[List[str]] = None
-) -> None:
+class SchemaNode(NamedTuple):
+    """One leaf or section of a compiled schema."""
+    path: str                 # Full dot-notation path
+    key: str                  # Key within the parent section
+    parent: str               # Dot-notation path of the parent ("" for root)
+    type: Optional[str]       # Leaf type name; None for sections
+    required: bool            # Leaf is required / section has required children
+    end: int                  # Plan index just past this node's subtree
+
+
+_TYPE_CHECKS = {
+    "string": str,
+    "integer": int,
+    "boolean": bool,
+}
+
+
+def compile_schema(schema: Dict[str, Any]) -> List[SchemaNode]:
     """
-    Validate secrets against schema with comprehensive error collection.
+    Compile a schema definition into a flat validation plan.
 
-    Collects ALL errors before raising, so operator can fix everything at once.
+    Sections precede their children, and each node records where its
+    subtree ends so validation can skip missing sections in one step.
 
     Args:
         schema: The schema definition (from schema.yaml)
+
+    Returns:
+        List of SchemaNode in document order
+    """
+    plan: List[SchemaNode] = []
+
+    def visit(rules: Dict[str, Any], parent: str) -> bool:
+        has_required = False
+
+        for key, child in rules.items():
+            if not isinstance(child, dict):
+                continue
+
+            full_path = f"{parent}.{key}" if parent else key
+
+            if "type" in child:
+                required = bool(child.get("required", False))
+                plan.append(SchemaNode(full_path, key, parent, child["type"], required, len(plan) + 1))
+            else:
+                # Reserve the section's slot; required and end are filled in
+                # once the subtree has been visited
+                index = len(plan)
+                plan.append(SchemaNode(full_path, key, parent, None, False, -1))
+                required = visit(child, full_path) or bool(child.get("required", False))
+                plan[index] = plan[index]._replace(required=required, end=len(plan))
+
+            has_required = has_required or required
+
+        return has_required
+
+    visit(schema, "")
+    return plan
+
+
+def validate_compiled(plan: List[SchemaNode], secrets: Dict[str, Any]) -> None:
+    """
+    Validate secrets against a compiled schema plan.
+
+    Collects ALL errors before raising, so operator can fix everything at once.
+
+    Args:
+        plan: Compiled schema from compile_schema()
         secrets: The decrypted secrets to validate
-        path: Current path in the schema (for nested validation)
-        errors: Accumulated errors (internal use)
 
     Raises:
         SchemaError: With list of all validation failures
     """
-    if errors is None:
-        errors = []
-
-    for key, rules in schema.items():
-        full_path = f"{path}.{key}" if path else key
+    errors: List[str] = []
+    sections: Dict[str, Dict[str, Any]] = {"": secrets}
+    i = 0
 
-        if isinstance(rules, dict) and "type" in rules:
-            # Leaf node - validate type and required
-            is_required = rules.get("required", False)
+    while i < len(plan):
+        node = plan[i]
+        container = sections[node.parent]
 
-            if key not in secrets:
-                if is_required:
-                    errors.append(f"MISSING REQUIRED: {full_path}")
-                continue
+        if node.key not in container:
+            if node.required:
+                kind = "SECTION" if node.type is None else "REQUIRED"
+                errors.append(f"MISSING {kind}: {node.path}")
+            i = node.end
+            continue
 
-            value = secrets[key]
-            expected_type = rules["type"]
+        value = container[node.key]
 
-            if expected_type == "string" and not isinstance(value, str):
-                errors.append(
-                    f"TYPE ERROR: {full_path} must be string, got {type(value).__name__}"
-                )
-            elif expected_type == "integer" and not isinstance(value, int):
-                errors.append(
-                    f"TYPE ERROR: {full_path} must be integer, got {type(value).__name__}"
-                )
-            elif expected_type == "boolean" and not isinstance(value, bool):
+        if node.type is None:
+            if not isinstance(value, dict):
                 errors.append(
-                    f"TYPE ERROR: {full_path} must be boolean, got {type(value).__name__}"
+                    f"TYPE ERROR: {node.path} must be object, got {type(value).__name__}"
                 )
-
-        elif isinstance(rules, dict):
-            # Nested section - recurse
-            if key not in secrets:
-                # Check if any child is required
-                has_required_children = _has_required_children(rules)
-                if has_required_children:
-                    errors.append(f"MISSING SECTION: {full_path}")
+                i = node.end
                 continue
-
-            if not isinstance(secrets[key], dict):
+            sections[node.path] = value
+        else:
+            expected = _TYPE_CHECKS.get(node.type)
+            if expected is not None and not isinstance(value, expected):
                 errors.append(
-                    f"TYPE ERROR: {full_path} must be object, got {type(secrets[key]).__name__}"
+                    f"TYPE ERROR: {node.path} must be {node.type}, got {type(value).__name__}"
                 )
-                continue
 
-            validate(rules, secrets[key], full_path, errors)
+        i += 1
 
-    # Only raise at top level with all collected errors
-    if path == "" and errors:
+    if errors:
         error_list = "\n  - ".join(errors)
         raise SchemaError(
             f"Secrets validation failed with {len(errors)} error(s):\n  - {error_list}"
         )
 
 
-def _has_required_children(rules: Dict[str, Any]) -> bool:
-    """Check if a schema section has any required children (recursively)."""
-    for value in rules.values():
-        if isinstance(value, dict):
-            if value.get("required", False):
-                return True
-            if _has_required_children(value):
-                return True
-    return False
+def validate(schema: Dict[str, Any], secrets: Dict[str, Any]) -> None:
+    """
+    Validate secrets against schema with comprehensive error collection.
+
+    Args:
+        schema: The schema definition (from schema.yaml)
+        secrets: The decrypted secrets to validate
+
+    Raises:
+        SchemaError: With list of all validation failures
+    """
+    validate_compiled(compile_schema(schema), secrets)
 
 
-def get_required_fields(schema: Dict[str, Any], path: str = "") -> List[str]:
+def get_required_fields(schema: Dict[str, Any]) -> List[str]:
     """
     Extract list of all required field paths from schema.
 
@@ -108,21 +152,11 @@ def get_required_fields(schema: Dict[str, Any], path: str = "") -> List[str]:
 
     Args:
         schema: The schema definition
-        path: Current path prefix
 
     Returns:
         List of dot-notation paths to required fields
     """
-    required: List[str] = []
-
-    for key, rules in schema.items():
-        full_path = f"{path}.{key}" if path else key
-
-        if isinstance(rules, dict) and "type" in rules:
-            if rules.get("required", False):
-                required.append(full_path)
-        elif isinstance(rules, dict):
-            required.extend(get_required_fields(rules, full_path))
-
-    return required
-
+    return [
+        node.path for node in compile_schema(schema)
+        if node.type is not None and node.required
+    ]
@@ -8,20 +8,54 @@ Security guarantees:
 - Never returns defaults for missing secrets
 """
 
+import json
 import logging
 import os
 import stat
 import subprocess
+import threading
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import yaml
 
 from .backend import SecretsBackend
-from .schema import SchemaError, validate
+from .schema import SchemaError, SchemaNode, compile_schema, validate_compiled
 
 logger = logging.getLogger(__name__)
 
+# Permission bits checked on the age key and secrets file
+_WORLD_READ = stat.S_IROTH
+_GROUP_READ = stat.S_IRGRP
+
+# Compiled default schema, shared by every backend instance
+_default_schema_plan: Optional[List[SchemaNode]] = None
+_default_schema_lock = threading.Lock()
+
+
+def _read_schema(schema_path: Path) -> List[SchemaNode]:
+    """Read and compile a schema file, failing fast if it is missing."""
+    if not schema_path.exists():
+        raise RuntimeError(
+            f"FATAL: Schema file not found: {schema_path}. "
+            "Cannot validate secrets without schema definition."
+        )
+
+    with open(schema_path) as f:
+        return compile_schema(yaml.load(f, Loader=yaml.CSafeLoader))
+
+
+def _load_default_schema(schema_path: Path) -> List[SchemaNode]:
+    """Return the compiled default schema, parsing it on first use only."""
+    global _default_schema_plan
+
+    if _default_schema_plan is None:
+        with _default_schema_lock:
+            if _default_schema_plan is None:
+                _default_schema_plan = _read_schema(schema_path)
+
+    return _default_schema_plan
+
 
 class SOPSBackend(SecretsBackend):
     """
@@ -37,6 +71,16 @@ class SOPSBackend(SecretsBackend):
     All failures raise exceptions - no silent degradation.
     """
 
+    __slots__ = (
+        "path",
+        "age_key_path",
+        "schema_path",
+        "_secrets",
+        "_flat",
+        "_flat_nonstring",
+        "_initialized",
+    )
+
     DEFAULT_AGE_KEY_PATH = Path.home() / ".config" / "mira" / "age.key"
     DEFAULT_SECRETS_PATH = Path("secrets.enc.yaml")
     DEFAULT_SCHEMA_PATH = Path(__file__).parent / "schema.yaml"
@@ -59,11 +103,17 @@ class SOPSBackend(SecretsBackend):
         self.age_key_path = age_key_path or self.DEFAULT_AGE_KEY_PATH
         self.schema_path = schema_path or self.DEFAULT_SCHEMA_PATH
         self._secrets: Dict[str, Any] = {}
+        # Dotted path -> string leaf, and dotted path -> type name for every
+        # other node, so get() is a single dict lookup
+        self._flat: Dict[str, str] = {}
+        self._flat_nonstring: Dict[str, str] = {}
         self._initialized = False
 
     def _validate_age_key_exists(self) -> None:
         """Verify age private key exists before attempting decryption."""
-        if not self.age_key_path.exists():
+        try:
+            mode = os.stat(self.age_key_path).st_mode
+        except FileNotFoundError:
             raise RuntimeError(
                 f"FATAL: Age private key not found at {self.age_key_path}. "
                 "Run 'mira secrets init' to generate encryption keys. "
@@ -71,8 +121,7 @@ class SOPSBackend(SecretsBackend):
             )
 
         # Check key file permissions
-        mode = self.age_key_path.stat().st_mode
-        if mode & stat.S_IROTH:
+        if mode & _WORLD_READ:
             raise RuntimeError(
                 f"SECURITY ERROR: {self.age_key_path} is world-readable. "
                 f"Fix with: chmod 600 {self.age_key_path}"
@@ -80,23 +129,23 @@ class SOPSBackend(SecretsBackend):
 
     def _validate_secrets_file(self) -> None:
         """Verify secrets file exists and has secure permissions."""
-        if not self.path.exists():
+        try:
+            mode = os.stat(self.path).st_mode
+        except FileNotFoundError:
             raise FileNotFoundError(
                 f"FATAL: Secrets file not found: {self.path}. "
                 "Run 'mira secrets init' to create encrypted secrets file."
             )
 
-        mode = self.path.stat().st_mode
-
         # Check if file is world-readable (security violation)
-        if mode & stat.S_IROTH:
+        if mode & _WORLD_READ:
             raise RuntimeError(
                 f"SECURITY ERROR: {self.path} is world-readable. "
                 f"Fix with: chmod 600 {self.path}"
             )
 
         # Warn if group-readable
-        if mode & stat.S_IRGRP:
+        if mode & _GROUP_READ:
             logger.warning(
                 f"SECURITY WARNING: {self.path} is group-readable. "
                 f"Recommended: chmod 600 {self.path}"
@@ -104,18 +153,27 @@ class SOPSBackend(SecretsBackend):
 
     def _decrypt_secrets(self) -> Dict[str, Any]:
         """Decrypt SOPS file with integrity verification."""
-        try:
-            # Set SOPS_AGE_KEY_FILE for sops to find the key
-            env = os.environ.copy()
-            env["SOPS_AGE_KEY_FILE"] = str(self.age_key_path)
+        # Read the file we just validated and hand sops those exact bytes, so
+        # sops never reopens a path that could change after our permission check
+        encrypted = self.path.read_bytes()
 
+        try:
+            # sops only needs PATH (binary lookup), HOME, and the age key
+            env = {
+                "PATH": os.environ.get("PATH", ""),
+                "HOME": os.environ.get("HOME", ""),
+                "SOPS_AGE_KEY_FILE": str(self.age_key_path),
+            }
+
+            # JSON output parses in C; YAML would go through pure-Python PyYAML
             result = subprocess.run(
-                ["sops", "-d", str(self.path)],
+                ["sops", "-d", "--input-type", "yaml", "--output-type", "json", "/dev/stdin"],
+                input=encrypted,
                 capture_output=True,
                 env=env,
                 check=True
             )
-            return yaml.safe_load(result.stdout)
+            return json.loads(result.stdout)
 
         except FileNotFoundError:
             raise RuntimeError(
@@ -141,27 +199,44 @@ class SOPSBackend(SecretsBackend):
 
     def _validate_schema(self, secrets: Dict[str, Any]) -> None:
         """Validate secrets against schema with fail-fast semantics."""
-        if not self.schema_path.exists():
-            raise RuntimeError(
-                f"FATAL: Schema file not found: {self.schema_path}. "
-                "Cannot validate secrets without schema definition."
-            )
-
-        with open(self.schema_path) as f:
-            schema = yaml.safe_load(f)
+        if self.schema_path == self.DEFAULT_SCHEMA_PATH:
+            plan = _load_default_schema(self.schema_path)
+        else:
+            plan = _read_schema(self.schema_path)
 
         try:
-            validate(schema, secrets)
+            validate_compiled(plan, secrets)
         except SchemaError as e:
             raise RuntimeError(
                 f"FATAL: {e}. Application cannot start with missing required secrets."
             )
 
+    def _flatten_secrets(self) -> None:
+        """Index the decrypted tree by dotted path for O(1) lookups."""
+        self._flat = {}
+        self._flat_nonstring = {}
+        # Prefixes carry their trailing dot so each key costs one concatenation;
+        # keys are always strings since sops output is parsed as JSON
+        stack = [("", self._secrets)]
+
+        while stack:
+            prefix, node = stack.pop()
+            for key, value in node.items():
+                full_path = prefix + key
+                if isinstance(value, str):
+                    self._flat[full_path] = value
+                else:
+                    self._flat_nonstring[full_path] = type(value).__name__
+                    if isinstance(value, dict):
+                        stack.append((full_path + ".", value))
+
     def init(self) -> None:
         """
         Initialize backend with full security validation.
 
         Raises on ANY security or configuration issue - no silent failures.
+        Idempotent: once initialized, further calls return immediately so
+        sops is only invoked once per backend instance.
         Order of operations:
         1. Verify age key exists and has secure permissions
         2. Verify secrets file exists and has secure permissions
@@ -172,6 +247,9 @@ class SOPSBackend(SecretsBackend):
             RuntimeError: On any security or configuration error
             FileNotFoundError: If required files are missing
         """
+        if self._initialized:
+            return
+
         logger.info("Initializing SOPS secrets backend...")
 
         # 1. Verify age key exists
@@ -190,6 +268,8 @@ class SOPSBackend(SecretsBackend):
         self._validate_schema(self._secrets)
         logger.info("Secrets validation passed - all required secrets present")
 
+        self._flatten_secrets()
+
         self._initialized = True
 
     def get(self, path: str) -> str:
@@ -213,23 +293,20 @@ class SOPSBackend(SecretsBackend):
                 "Call init() before accessing secrets."
             )
 
-        parts = path.split(".")
-        node = self._secrets
-
-        for p in parts:
-            if not isinstance(node, dict) or p not in node:
-                raise KeyError(
-                    f"REQUIRED SECRET NOT FOUND: {path}. "
-                    "Edit secrets.enc.yaml to add missing secret."
-                )
-            node = node[p]
+        try:
+            return self._flat[path]
+        except KeyError:
+            pass
 
-        if not isinstance(node, str):
+        if path in self._flat_nonstring:
             raise ValueError(
-                f"Secret at {path} is not a string (got {type(node).__name__})"
+                f"Secret at {path} is not a string (got {self._flat_nonstring[path]})"
             )
 
-        return node
+        raise KeyError(
+            f"REQUIRED SECRET NOT FOUND: {path}. "
+            "Edit secrets.enc.yaml to add missing secret."
+        )
 
     def get_optional(self, path: str, default: Optional[str] = None) -> Optional[str]:
         """
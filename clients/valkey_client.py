@@ -19,6 +19,15 @@ logger = logging.getLogger(__name__)
 # Global connection pool (singleton like PostgresClient)
 _valkey_pool = None
 
+# Replace a key (with expiry) only if it still holds the expected value
+_COMPARE_AND_SETEX_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('SETEX', KEYS[1], ARGV[2], ARGV[3])
+    return 1
+end
+return 0
+"""
+
 @dataclass
 class TTLPersistenceHandler:
     key_prefix: str
@@ -105,6 +114,7 @@ class ValkeyClient:
         # Use pooled connections
         self._client = valkey.Valkey(connection_pool=_valkey_pool)
         self._client.ping()  # Raises if unreachable - system fails to start
+        self._compare_and_setex_script = self._client.register_script(_COMPARE_AND_SETEX_LUA)
 
         # Create binary client using same connection params but without decode_responses
         binary_conn_params = conn_params.copy()
@@ -366,6 +376,41 @@ class ValkeyClient:
         """Set key with expiration."""
         return self._client.setex(key, seconds, value)
 
+    def mget(self, keys: List[str]) -> List[Optional[str]]:
+        """Get several keys in one round trip; missing keys come back as None."""
+        if not keys:
+            return []
+        return self._client.mget(keys)
+
+    def pipeline(self, transaction: bool = True):
+        """
+        Start a pipeline that sends its queued commands in one round trip.
+
+        With transaction=True the commands run atomically as MULTI/EXEC.
+        Use as a context manager and call execute() to send.
+        """
+        return self._client.pipeline(transaction=transaction)
+
+    def publish(self, channel: str, message: str) -> int:
+        """Publish a message to a channel; returns the number of subscribers reached."""
+        return self._client.publish(channel, message)
+
+    def async_pubsub(self):
+        """
+        Create a pub/sub connection on the async client.
+
+        The caller subscribes, awaits get_message(), and must aclose() it.
+        """
+        return self.valkey.pubsub()
+
+    def compare_and_setex(self, key: str, expected: str, seconds: int, value: str) -> bool:
+        """
+        Atomically set key with expiration only if it currently holds expected.
+
+        Returns True if the value was replaced, False if the key changed or expired.
+        """
+        return bool(self._compare_and_setex_script(keys=[key], args=[expected, seconds, value]))
+
     # Set operations for HITL approval service
     def sadd(self, key: str, *members) -> int:
         """Add members to a set."""
@@ -9,6 +9,9 @@ from datetime import datetime
 from typing import Any, Dict, Optional, Union
 from dataclasses import dataclass
 
+import orjson
+from fastapi.responses import JSONResponse
+
 from utils.timezone_utils import utc_now, format_utc_iso
 
 logger = logging.getLogger(__name__)
@@ -38,6 +41,18 @@ class APIResponse:
         return result
 
 
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered by orjson, for endpoints returning plain dicts.
+
+    Defined here because FastAPI's own ORJSONResponse is deprecated and
+    warns on every instantiation.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
 class APIError(Exception):
     """Base API error with structured details."""
     
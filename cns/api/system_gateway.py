@@ -5,22 +5,33 @@ Provides endpoints for managing HITL approval requests for system gateway operat
 """
 
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel, Field
 
+from cns.api.base import ORJSONResponse
 from utils.user_context import get_current_user_id
 from services.hitl_approval_service import (
     get_hitl_service,
     ApprovalStatus,
     ApprovalRequest,
+    HITLApprovalService,
+    TransitionResult,
 )
-from cns.api.base import APIResponse
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/system-gateway", tags=["system-gateway"])
+router = APIRouter(
+    prefix="/system-gateway",
+    tags=["system-gateway"],
+    default_response_class=ORJSONResponse,
+)
+
+
+# Response status strings, resolved once instead of per request
+_APPROVED_STR = ApprovalStatus.APPROVED.value
+_REJECTED_STR = ApprovalStatus.REJECTED.value
 
 
 # --- Request/Response Models ---
@@ -34,7 +45,7 @@ class ApprovalListResponse(BaseModel):
 
 class ApprovalActionRequest(BaseModel):
     """Request model for approve/reject actions."""
-    action: str = Field(..., pattern="^(approve|reject)$", description="Action to take")
+    action: Literal["approve", "reject"] = Field(..., description="Action to take")
     reason: Optional[str] = Field(default=None, description="Reason for rejection")
 
 
@@ -46,38 +57,53 @@ class ApprovalActionResponse(BaseModel):
     message: str
 
 
+# --- Dependencies ---
+
+async def hitl_service() -> HITLApprovalService:
+    """
+    Resolve the HITL approval service once per request.
+
+    Declared async so FastAPI calls it inline; sync dependencies are
+    dispatched to the threadpool.
+    """
+    return get_hitl_service()
+
+
 # --- Endpoints ---
 
-@router.get("/approvals", response_model=ApprovalListResponse)
+# Response models document the OpenAPI schema only; endpoints return
+# ORJSONResponse directly so already-built dicts skip response validation.
+
+@router.get("/approvals", responses={200: {"model": ApprovalListResponse}})
 async def list_pending_approvals(
-    user_id: str = Depends(get_current_user_id)
-) -> ApprovalListResponse:
+    user_id: str = Depends(get_current_user_id),
+    service: HITLApprovalService = Depends(hitl_service)
+) -> ORJSONResponse:
     """
     List all pending approval requests for the current user.
     
     Returns pending system gateway operations awaiting user approval.
     """
-    service = get_hitl_service()
     pending = await service.get_pending_for_user(user_id)
     
-    return ApprovalListResponse(
-        success=True,
-        approvals=[req.to_dict() for req in pending],
-        count=len(pending)
-    )
+    return ORJSONResponse({
+        "success": True,
+        "approvals": [r.to_dict() for r in pending],
+        "count": len(pending),
+    })
 
 
 @router.get("/approvals/{approval_id}")
 async def get_approval_status(
     approval_id: str,
-    user_id: str = Depends(get_current_user_id)
-) -> Dict[str, Any]:
+    user_id: str = Depends(get_current_user_id),
+    service: HITLApprovalService = Depends(hitl_service)
+) -> ORJSONResponse:
     """
     Get the status of a specific approval request.
     
     Returns the current state of the approval (pending, approved, rejected, expired).
     """
-    service = get_hitl_service()
     request = await service.get_status(approval_id)
     
     if not request:
@@ -87,57 +113,52 @@ async def get_approval_status(
     if request.user_id != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to view this approval")
     
-    return APIResponse(
-        success=True,
-        data=request.to_dict()
-    ).to_dict()
+    return ORJSONResponse({"success": True, "data": request.to_dict()})
 
 
-@router.patch("/approvals/{approval_id}", response_model=ApprovalActionResponse)
+@router.patch("/approvals/{approval_id}", responses={200: {"model": ApprovalActionResponse}})
 async def update_approval(
     approval_id: str,
     body: ApprovalActionRequest,
-    user_id: str = Depends(get_current_user_id)
-) -> ApprovalActionResponse:
+    user_id: str = Depends(get_current_user_id),
+    service: HITLApprovalService = Depends(hitl_service)
+) -> ORJSONResponse:
     """
     Approve or reject a pending approval request.
     
     Only the user who initiated the request can approve/reject it.
     """
-    service = get_hitl_service()
-    request = await service.get_status(approval_id)
-    
-    if not request:
+    if body.action == "approve":
+        status = ApprovalStatus.APPROVED
+        status_str = _APPROVED_STR
+        message = "Operation approved"
+    else:
+        status = ApprovalStatus.REJECTED
+        status_str = _REJECTED_STR
+        message = f"Operation rejected: {body.reason}" if body.reason else "Operation rejected"
+
+    # Ownership check, pending check, and write in one service call
+    result, request = await service.transition(approval_id, user_id, status, reason=body.reason)
+
+    # request is None only for NOT_FOUND; checking it here narrows the type
+    if result is TransitionResult.NOT_FOUND or request is None:
         raise HTTPException(status_code=404, detail="Approval request not found or expired")
-    
-    # Verify user owns this request
-    if request.user_id != user_id:
+
+    if result is TransitionResult.FORBIDDEN:
         raise HTTPException(status_code=403, detail="Not authorized to modify this approval")
-    
-    if request.status != ApprovalStatus.PENDING:
+
+    if result is TransitionResult.ALREADY_PROCESSED:
         raise HTTPException(
             status_code=400,
             detail=f"Approval already processed: {request.status.value}"
         )
     
-    if body.action == "approve":
-        success = await service.approve(approval_id, approved_by=user_id)
-        message = "Operation approved"
-        status = ApprovalStatus.APPROVED.value
-    else:
-        success = await service.reject(approval_id, rejected_by=user_id, reason=body.reason)
-        message = f"Operation rejected: {body.reason}" if body.reason else "Operation rejected"
-        status = ApprovalStatus.REJECTED.value
-    
-    if not success:
-        raise HTTPException(status_code=500, detail="Failed to update approval status")
-    
-    logger.info(f"User {user_id} {body.action}d approval {approval_id}")
+    logger.info("User %s %sd approval %s", user_id, body.action, approval_id)
     
-    return ApprovalActionResponse(
-        success=True,
-        approval_id=approval_id,
-        status=status,
-        message=message
-    )
+    return ORJSONResponse({
+        "success": True,
+        "approval_id": approval_id,
+        "status": status_str,
+        "message": message,
+    })
 
@@ -602,4 +602,9 @@ class SystemGatewayConfig(BaseModel):
         ],
         description="File patterns blocked from access"
     )
+    settings_cache_ttl: int = Field(
+        default=60,
+        ge=0,
+        description="Seconds to cache per-user gateway settings in process (0 disables)"
+    )
 
@@ -4,12 +4,13 @@ Configuration for System Gateway service.
 Reads from environment variables with sensible defaults.
 """
 
+import functools
 import os
 from pathlib import Path
 from typing import List
 
 from pydantic import Field
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
@@ -37,24 +38,34 @@ class Settings(BaseSettings):
     max_output_lines: int = Field(default=10000, alias="MAX_OUTPUT_LINES")
     
     # Tree indexer settings
-    index_db_path: str = Field(default="/tmp/gateway/tree_index.db", alias="INDEX_DB_PATH")
+    # ":memory:" keeps the disposable index off the filesystem entirely
+    index_db_path: str = Field(default=":memory:", alias="INDEX_DB_PATH")
     index_update_debounce_ms: int = Field(default=500, alias="INDEX_DEBOUNCE_MS")
     
-    @property
+    @functools.cached_property
     def blocked_patterns(self) -> List[str]:
-        """Parse blocked patterns from comma-separated string."""
+        """Parse blocked patterns from comma-separated string (once per instance)."""
         return [p.strip() for p in self.blocked_patterns_str.split(",") if p.strip()]
     
-    @property
+    @functools.cached_property
     def workspace_path(self) -> Path:
         """Get workspace as Path object."""
         return Path(self.workspace_root)
     
-    class Config:
-        env_file = ".env"
-        extra = "ignore"
+    @functools.cached_property
+    def workspace_path_resolved(self) -> Path:
+        """Workspace with symlinks resolved; the root does not move at runtime."""
+        return self.workspace_path.resolve()
+    
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore", frozen=True)
+
+
+@functools.lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get the process-wide settings, reading environment and .env once."""
+    return Settings()
 
 
 # Global settings instance
-settings = Settings()
+settings = get_settings()
 
@@ -8,7 +8,6 @@ mounted /workspace directory.
 
 import logging
 import os
-import signal
 import sys
 from contextlib import asynccontextmanager
 from typing import Any
@@ -18,6 +17,7 @@ from fastapi.responses import JSONResponse
 
 from config import settings
 from routers import structure, files, execute
+from services.path_validator import PathValidator
 from services.tree_indexer import TreeIndexer
 
 # Configure logging
@@ -48,14 +48,16 @@ async def lifespan(app: FastAPI):
     
     # Store in app state for access in routes
     app.state.tree_indexer = tree_indexer
+    app.state.path_validator = PathValidator()
     
-    yield
-    
-    # Shutdown
-    logger.info("Shutting down System Gateway...")
-    if tree_indexer:
-        tree_indexer.stop()
-    logger.info("Shutdown complete")
+    # SIGTERM/SIGINT are handled by uvicorn, which runs this shutdown path
+    try:
+        yield
+    finally:
+        logger.info("Shutting down System Gateway...")
+        if tree_indexer:
+            tree_indexer.stop()
+        logger.info("Shutdown complete")
 
 
 # Create FastAPI application
@@ -86,7 +88,8 @@ async def health_check() -> dict[str, Any]:
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception) -> JSONResponse:
     """Global exception handler for unhandled errors."""
-    logger.error(f"Unhandled exception: {exc}", exc_info=True)
+    # logging skips the message and traceback formatting if ERROR is disabled
+    logger.error("Unhandled exception: %s", exc, exc_info=exc)
     return JSONResponse(
         status_code=500,
         content={
@@ -97,17 +100,6 @@ async def global_exception_handler(request: Request, exc: Exception) -> JSONResp
     )
 
 
-def handle_signal(signum: int, frame: Any) -> None:
-    """Handle shutdown signals gracefully."""
-    logger.info(f"Received signal {signum}, initiating shutdown...")
-    sys.exit(0)
-
-
-# Register signal handlers
-signal.signal(signal.SIGTERM, handle_signal)
-signal.signal(signal.SIGINT, handle_signal)
-
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -4,29 +4,42 @@ Command execution endpoint for System Gateway.
 Provides sandboxed shell command execution within the workspace.
 """
 
+import asyncio
 import os
+import re
 import shlex
-import subprocess
+import signal
 import time
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, Field
 
 from config import settings
-from services.path_validator import PathValidator, PathValidationError
+from services.path_validator import PathValidationError
 
 router = APIRouter()
 
+# Pipe read size while streaming command output
+_READ_CHUNK = 65536
+
+# Environment for commands run from the workspace root. Built once and passed
+# as-is when a request has no overrides; it is never mutated.
+_BASE_ENV = {
+    **os.environ,
+    "HOME": str(settings.workspace_path),
+    "PWD": str(settings.workspace_path),
+}
+
 # Commands that are always blocked
-BLOCKED_COMMANDS = {
+BLOCKED_COMMANDS = frozenset({
     "sudo", "su", "chmod", "chown", "chgrp",
     "mount", "umount", "mkfs", "fdisk",
     "dd", "reboot", "shutdown", "halt", "init",
     "iptables", "ip6tables", "nft",
     "passwd", "useradd", "userdel", "usermod",
     "nc", "netcat", "ncat",  # Network tools (if network is disabled)
-}
+})
 
 # Patterns that indicate dangerous commands
 DANGEROUS_PATTERNS = [
@@ -37,6 +50,9 @@ DANGEROUS_PATTERNS = [
     "~/.ssh", "~/.gnupg",
 ]
 
+# All dangerous patterns as one alternation, so a command is scanned once
+_DANGEROUS_RE = re.compile("|".join(map(re.escape, DANGEROUS_PATTERNS)))
+
 
 class ExecuteRequest(BaseModel):
     """Request model for command execution."""
@@ -56,6 +72,31 @@ class ExecuteResponse(BaseModel):
     truncated: bool = False
 
 
+# Separators and quoting characters as seen by shlex in POSIX mode
+_WHITESPACE = " \t\r\n"
+_SHLEX_SPECIAL = frozenset("'\"\\")
+
+
+def _first_token(command: str) -> str:
+    """
+    Return the first shell word of a command.
+    
+    Plain leading words are sliced directly; a word containing quotes or
+    escapes is handed to shlex for exact parsing.
+    
+    Raises:
+        ValueError: If shlex cannot parse the command
+    """
+    stripped = command.lstrip(_WHITESPACE)
+    for i, char in enumerate(stripped):
+        if char in _WHITESPACE:
+            return stripped[:i]
+        if char in _SHLEX_SPECIAL:
+            parts = shlex.split(command)
+            return parts[0] if parts else ""
+    return stripped
+
+
 def validate_command(command: str) -> None:
     """
     Validate command is safe to execute.
@@ -64,14 +105,14 @@ def validate_command(command: str) -> None:
     """
     # Check for blocked commands
     try:
-        parts = shlex.split(command)
+        first = _first_token(command)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid command syntax")
     
-    if not parts:
+    if not first:
         raise HTTPException(status_code=400, detail="Empty command")
     
-    base_cmd = os.path.basename(parts[0])
+    base_cmd = os.path.basename(first)
     
     if base_cmd in BLOCKED_COMMANDS:
         raise HTTPException(
@@ -80,16 +121,46 @@ def validate_command(command: str) -> None:
         )
     
     # Check for dangerous patterns
-    for pattern in DANGEROUS_PATTERNS:
-        if pattern in command:
-            raise HTTPException(
-                status_code=403,
-                detail=f"Command contains blocked pattern: {pattern}"
-            )
+    match = _DANGEROUS_RE.search(command)
+    if match:
+        raise HTTPException(
+            status_code=403,
+            detail=f"Command contains blocked pattern: {match.group()}"
+        )
+
+
+def _kill_process_group(proc: asyncio.subprocess.Process) -> None:
+    """Kill the shell and everything it spawned."""
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+async def _read_capped(stream: asyncio.StreamReader, cap: int) -> tuple[str, bool]:
+    """
+    Read a stream to EOF, keeping at most `cap` bytes.
+    
+    Output past the cap is drained and discarded, so memory stays bounded
+    while the command still runs to completion.
+    """
+    buf = bytearray()
+    truncated = False
+    while chunk := await stream.read(_READ_CHUNK):
+        room = cap - len(buf)
+        if room > 0:
+            buf += chunk[:room]
+        if len(chunk) > room:
+            truncated = True
+    
+    output = buf.decode("utf-8", errors="replace")
+    if truncated:
+        output += "\n... (output truncated)"
+    return output, truncated
 
 
 @router.post("/execute", response_model=ExecuteResponse)
-async def execute_command(body: ExecuteRequest) -> ExecuteResponse:
+async def execute_command(request: Request, body: ExecuteRequest) -> ExecuteResponse:
     """
     Execute a shell command in the workspace.
     
@@ -103,68 +174,71 @@ async def execute_command(body: ExecuteRequest) -> ExecuteResponse:
     timeout = min(body.timeout, settings.max_timeout)
     
     # Validate and resolve working directory
-    validator = PathValidator()
     if body.cwd:
         try:
-            cwd = validator.validate(body.cwd)
+            cwd = request.app.state.path_validator.validate(body.cwd)
         except PathValidationError as e:
             raise HTTPException(status_code=400, detail=f"Invalid cwd: {e}")
     else:
         cwd = settings.workspace_path
     
-    # Build environment
-    env = os.environ.copy()
-    env["HOME"] = str(settings.workspace_path)
-    env["PWD"] = str(cwd)
-    if body.env:
-        env.update(body.env)
+    # Build environment (copied only when the request changes it)
+    if body.cwd or body.env:
+        env = {**_BASE_ENV, "PWD": str(cwd), **(body.env or {})}
+    else:
+        env = _BASE_ENV
     
-    # Execute command
+    # Execute command without blocking the event loop
     start_time = time.time()
     try:
-        result = subprocess.run(
+        proc = await asyncio.create_subprocess_shell(
             body.command,
-            shell=True,
             cwd=str(cwd),
             env=env,
-            capture_output=True,
-            timeout=timeout,
-            text=True
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True  # Own process group, so a timeout kills children too
         )
         
-        duration_ms = int((time.time() - start_time) * 1000)
-        
-        # Truncate output if too long
-        stdout = result.stdout
-        stderr = result.stderr
-        truncated = False
+        # Truncate output while streaming (rough byte limit)
+        max_output = settings.max_output_lines * 100
+        try:
+            (stdout, stdout_truncated), (stderr, stderr_truncated), _ = await asyncio.wait_for(
+                asyncio.gather(
+                    _read_capped(proc.stdout, max_output),
+                    _read_capped(proc.stderr, max_output),
+                    proc.wait()
+                ),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            _kill_process_group(proc)
+            await proc.wait()
+            duration_ms = int((time.time() - start_time) * 1000)
+            return ExecuteResponse(
+                success=False,
+                exit_code=-1,
+                stdout="",
+                stderr=f"Command timed out after {timeout} seconds",
+                duration_ms=duration_ms
+            )
+        except BaseException:
+            # Cancelled (client disconnect, shutdown) or failed mid-read: the
+            # detached process group would otherwise outlive the request
+            if proc.returncode is None:
+                _kill_process_group(proc)
+            raise
         
-        max_output = settings.max_output_lines * 100  # Rough char limit
-        if len(stdout) > max_output:
-            stdout = stdout[:max_output] + "\n... (output truncated)"
-            truncated = True
-        if len(stderr) > max_output:
-            stderr = stderr[:max_output] + "\n... (output truncated)"
-            truncated = True
+        duration_ms = int((time.time() - start_time) * 1000)
         
         return ExecuteResponse(
-            success=result.returncode == 0,
-            exit_code=result.returncode,
+            success=proc.returncode == 0,
+            exit_code=proc.returncode,
             stdout=stdout,
             stderr=stderr,
             duration_ms=duration_ms,
-            truncated=truncated
+            truncated=stdout_truncated or stderr_truncated
         )
         
-    except subprocess.TimeoutExpired:
-        duration_ms = int((time.time() - start_time) * 1000)
-        return ExecuteResponse(
-            success=False,
-            exit_code=-1,
-            stdout="",
-            stderr=f"Command timed out after {timeout} seconds",
-            duration_ms=duration_ms
-        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Execution error: {e}")
-
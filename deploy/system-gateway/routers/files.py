@@ -4,18 +4,88 @@ File read/edit endpoints for System Gateway.
 Provides line-based file reading and atomic editing operations.
 """
 
+import asyncio
 import difflib
+import itertools
 import os
+import re
+import stat
+import tempfile
+from pathlib import Path
 from typing import Any, List, Literal, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, Field
 
 from config import settings
-from services.path_validator import PathValidator, PathValidationError
+from services.path_validator import PathValidationError
 
 router = APIRouter()
 
+# Process umask, read once so new files get the same mode open() would give
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# Diff preview size and the context lines unified_diff keeps around hunks
+DIFF_PREVIEW_LINES = 50
+_DIFF_CONTEXT = 3
+_HUNK_HEADER_RE = re.compile(r"^@@ -(\d+)(,\d+)? \+(\d+)(,\d+)? @@")
+
+
+def _diff_preview(original: List[str], new: List[str], path: str, head: int, tail: int) -> str:
+    """
+    Unified diff preview of an edit, limited to DIFF_PREVIEW_LINES.
+    
+    Only the span between the first `head` and last `tail` lines (which
+    the edit left untouched) is diffed; hunk headers are shifted back to
+    whole-file line numbers.
+    """
+    lo = max(0, head - _DIFF_CONTEXT)
+    trim = max(0, tail - _DIFF_CONTEXT)
+    diff = difflib.unified_diff(
+        original[lo:len(original) - trim], new[lo:len(new) - trim],
+        fromfile=f"a/{path}",
+        tofile=f"b/{path}",
+        n=_DIFF_CONTEXT,
+        lineterm=""
+    )
+    
+    def shift(match: re.Match) -> str:
+        a, a_len, b, b_len = match.groups()
+        return f"@@ -{int(a) + lo}{a_len or ''} +{int(b) + lo}{b_len or ''} @@"
+    
+    lines = itertools.islice(diff, DIFF_PREVIEW_LINES)
+    if lo:
+        lines = (_HUNK_HEADER_RE.sub(shift, line) if line.startswith("@@") else line for line in lines)
+    return "\n".join(lines)
+
+
+def _read_range(path: Path, start: int, count: int) -> tuple[List[str], int]:
+    """Read `count` lines from 0-indexed `start`; also return the file's line count."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        # Read only the selected lines; the rest of the file is just counted
+        skipped = sum(1 for _ in itertools.islice(f, start))
+        selected = list(itertools.islice(f, count)) if skipped == start else []
+        return selected, skipped + len(selected) + sum(1 for _ in f)
+
+
+def _atomic_write(path: Path, lines: List[str], mode: int) -> None:
+    """Replace a file's content so readers see either the old or the new content."""
+    tmp_path = None
+    try:
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=path.parent,
+            prefix=f".{path.name}.", suffix=".tmp", delete=False
+        ) as f:
+            tmp_path = f.name
+            f.writelines(lines)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+        tmp_path = None
+    finally:
+        if tmp_path is not None:
+            os.unlink(tmp_path)
+
 
 class ReadRequest(BaseModel):
     """Request model for file reading."""
@@ -36,14 +106,14 @@ class ReadResponse(BaseModel):
 
 
 @router.post("/read", response_model=ReadResponse)
-async def read_file(body: ReadRequest) -> ReadResponse:
+async def read_file(request: Request, body: ReadRequest) -> ReadResponse:
     """
     Read file contents with optional line range.
     
     Supports partial file reading to manage response size.
     Binary files are detected and flagged.
     """
-    validator = PathValidator()
+    validator = request.app.state.path_validator
     
     try:
         resolved = validator.validate(body.path)
@@ -76,29 +146,20 @@ async def read_file(body: ReadRequest) -> ReadResponse:
             is_binary=True
         )
     
-    # Read file
+    # Apply line range (0-indexed start; at most max_output_lines are kept)
+    start = (body.line_start or 1) - 1
+    wanted = settings.max_output_lines
+    if body.line_end is not None:
+        wanted = min(wanted, max(0, body.line_end - start))
+    
+    # Blocking file I/O runs off the event loop
     try:
-        with open(resolved, "r", encoding="utf-8", errors="replace") as f:
-            lines = f.readlines()
+        selected_lines, total_lines = await asyncio.to_thread(_read_range, resolved, start, wanted)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading file: {e}")
     
-    total_lines = len(lines)
-    
-    # Apply line range
-    start = (body.line_start or 1) - 1  # Convert to 0-indexed
-    end = body.line_end or total_lines
-    
-    # Clamp to valid range
-    start = max(0, min(start, total_lines))
-    end = max(start, min(end, total_lines))
-    
-    selected_lines = lines[start:end]
     truncated = len(selected_lines) >= settings.max_output_lines
     
-    if truncated:
-        selected_lines = selected_lines[:settings.max_output_lines]
-    
     return ReadResponse(
         success=True,
         path=body.path,
@@ -134,14 +195,14 @@ class EditResponse(BaseModel):
 
 
 @router.post("/edit", response_model=EditResponse)
-async def edit_file(body: EditRequest) -> EditResponse:
+async def edit_file(request: Request, body: EditRequest) -> EditResponse:
     """
     Apply atomic line-based edits to a file.
     
     All edits succeed together or the file is unchanged.
     Returns a unified diff preview of changes.
     """
-    validator = PathValidator()
+    validator = request.app.state.path_validator
     
     try:
         resolved = validator.validate_for_write(body.path)
@@ -152,54 +213,59 @@ async def edit_file(body: EditRequest) -> EditResponse:
     if not resolved.exists():
         if body.create_if_missing:
             original_lines: List[str] = []
+            file_mode = 0o666 & ~_UMASK
         else:
             raise HTTPException(status_code=404, detail=f"File not found: {body.path}")
     else:
         if resolved.is_dir():
             raise HTTPException(status_code=400, detail="Path is a directory")
         
+        file_mode = stat.S_IMODE(resolved.stat().st_mode)
         with open(resolved, "r", encoding="utf-8") as f:
             original_lines = f.readlines()
     
-    # Apply edits (sort by line number descending to avoid offset issues)
-    new_lines = original_lines.copy()
-    sorted_edits = sorted(body.edits, key=lambda e: e.line_start, reverse=True)
+    # Apply edits in one forward pass over the original lines
+    new_lines: List[str] = []
+    cursor = 0  # Next original line (0-indexed) not yet copied or replaced
+    sorted_edits = sorted(body.edits, key=lambda e: e.line_start)
     
     for edit in sorted_edits:
         idx = edit.line_start - 1  # Convert to 0-indexed
+        if idx < cursor:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Edit at line {edit.line_start} overlaps a previous edit"
+            )
         
-        if edit.action == "delete":
-            end_idx = (edit.line_end or edit.line_start)
-            del new_lines[idx:end_idx]
+        new_lines.extend(original_lines[cursor:idx])
+        cursor = idx
         
-        elif edit.action == "replace":
-            end_idx = (edit.line_end or edit.line_start)
+        if edit.action in ("replace", "insert"):
             content_lines = (edit.content or "").splitlines(keepends=True)
             if content_lines and not content_lines[-1].endswith("\n"):
                 content_lines[-1] += "\n"
-            new_lines[idx:end_idx] = content_lines
+            new_lines.extend(content_lines)
         
-        elif edit.action == "insert":
-            content_lines = (edit.content or "").splitlines(keepends=True)
-            if content_lines and not content_lines[-1].endswith("\n"):
-                content_lines[-1] += "\n"
-            new_lines[idx:idx] = content_lines
+        if edit.action in ("replace", "delete"):
+            cursor = max(idx, edit.line_end or edit.line_start)
     
-    # Generate diff
-    diff = difflib.unified_diff(
-        original_lines, new_lines,
-        fromfile=f"a/{body.path}",
-        tofile=f"b/{body.path}",
-        lineterm=""
+    new_lines.extend(original_lines[cursor:])
+    
+    # Diff (over the edited span only) and atomic write run concurrently,
+    # both off the event loop
+    unchanged_head = min(sorted_edits[0].line_start - 1, len(original_lines))
+    unchanged_tail = len(original_lines) - min(cursor, len(original_lines))
+    diff_task = asyncio.to_thread(
+        _diff_preview, original_lines, new_lines, body.path, unchanged_head, unchanged_tail
     )
-    diff_preview = "\n".join(list(diff)[:50])  # Limit diff preview
+    write_task = asyncio.to_thread(_atomic_write, resolved, new_lines, file_mode)
+    diff_result, write_result = await asyncio.gather(diff_task, write_task, return_exceptions=True)
     
-    # Write atomically
-    try:
-        with open(resolved, "w", encoding="utf-8") as f:
-            f.writelines(new_lines)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error writing file: {e}")
+    if isinstance(write_result, BaseException):
+        raise HTTPException(status_code=500, detail=f"Error writing file: {write_result}")
+    if isinstance(diff_result, BaseException):
+        raise diff_result
+    diff_preview = diff_result
     
     return EditResponse(
         success=True,
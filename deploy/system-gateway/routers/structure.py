@@ -9,7 +9,7 @@ from typing import Any, Optional
 from fastapi import APIRouter, Request, HTTPException
 from pydantic import BaseModel, Field
 
-from services.path_validator import PathValidator, PathValidationError
+from services.path_validator import PathValidationError
 
 router = APIRouter()
 
@@ -39,9 +39,8 @@ async def get_structure(request: Request, body: StructureRequest) -> StructureRe
     limited by depth parameter to manage response size.
     """
     # Validate path
-    validator = PathValidator()
     try:
-        validator.validate(body.path)
+        request.app.state.path_validator.validate(body.path)
     except PathValidationError as e:
         raise HTTPException(status_code=400, detail=str(e))
     
@@ -5,12 +5,18 @@ Prevents path traversal attacks, symlink escapes, and access to blocked patterns
 """
 
 import fnmatch
+import functools
 import os
+import re
 from pathlib import Path
 from typing import List
 
 from config import settings
 
+# Bytes that count as text for binary detection; deleting them from a sample
+# leaves only the non-text bytes
+_TEXT_BYTES = bytes(sorted({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100))))
+
 
 class PathValidationError(Exception):
     """Raised when path validation fails."""
@@ -18,11 +24,37 @@ class PathValidationError(Exception):
 
 
 class PathValidator:
-    """Validates and secures filesystem paths within workspace."""
+    """
+    Validates and secures filesystem paths within workspace.
+    
+    One instance is built at startup and shared by all requests, so the
+    workspace root and blocked patterns are read-only after construction.
+    """
     
     def __init__(self, workspace_root: str | None = None, blocked_patterns: List[str] | None = None):
-        self.workspace_root = Path(workspace_root or settings.workspace_root).resolve()
-        self.blocked_patterns = blocked_patterns or settings.blocked_patterns
+        if workspace_root:
+            self._workspace_root = Path(workspace_root).resolve()
+        else:
+            self._workspace_root = settings.workspace_path_resolved
+        # String forms for the containment check in validate()
+        self._root_str = str(self._workspace_root)
+        self._root_prefix = os.path.join(self._root_str, "")
+        self._blocked_patterns = tuple(blocked_patterns or settings.blocked_patterns)
+        # Raw patterns are kept alongside for error messages
+        self._compiled = tuple(
+            (pattern, re.compile(fnmatch.translate(pattern)))
+            for pattern in self._blocked_patterns
+        )
+    
+    @property
+    def workspace_root(self) -> Path:
+        """Resolved workspace root."""
+        return self._workspace_root
+    
+    @property
+    def blocked_patterns(self) -> tuple[str, ...]:
+        """Glob patterns that may never be accessed."""
+        return self._blocked_patterns
     
     def validate(self, path: str) -> Path:
         """
@@ -41,36 +73,35 @@ class PathValidator:
         if not path or path in (".", "./", "/"):
             return self.workspace_root
         
-        # Remove leading slash for relative path handling
-        clean_path = path.lstrip("/")
-        
-        # Construct absolute path
-        if Path(path).is_absolute():
-            # Absolute paths must be within workspace
-            target = Path(path)
+        # Absolute paths must be within workspace; relative ones are joined to it
+        if os.path.isabs(path):
+            target = path
         else:
-            target = self.workspace_root / clean_path
+            target = os.path.join(self._root_str, path)
         
-        # Resolve to catch .. traversal
+        # Resolve to catch .. traversal and symlink escapes. realpath already
+        # lstats every component; Path.resolve() would add a stat() on top
         try:
-            resolved = target.resolve()
-        except (OSError, RuntimeError) as e:
+            resolved_str = os.path.realpath(target)
+        except (OSError, ValueError) as e:
             raise PathValidationError(f"Cannot resolve path: {e}")
         
         # Check if within workspace (after resolving symlinks)
-        try:
-            resolved.relative_to(self.workspace_root)
-        except ValueError:
+        if resolved_str == self._root_str:
+            relative_path = "."
+        elif resolved_str.startswith(self._root_prefix):
+            relative_path = resolved_str[len(self._root_prefix):]
+        else:
             raise PathValidationError(
-                f"Path escapes workspace: {path} resolves to {resolved}"
+                f"Path escapes workspace: {path} resolves to {resolved_str}"
             )
         
+        resolved = Path(resolved_str)
+        
         # Check blocked patterns
-        relative_path = str(resolved.relative_to(self.workspace_root))
-        for pattern in self.blocked_patterns:
-            if fnmatch.fnmatch(relative_path, pattern):
-                raise PathValidationError(f"Access blocked by pattern: {pattern}")
-            if fnmatch.fnmatch(resolved.name, pattern):
+        name = resolved.name
+        for pattern, regex in self._compiled:
+            if regex.match(relative_path) or regex.match(name):
                 raise PathValidationError(f"Access blocked by pattern: {pattern}")
         
         return resolved
@@ -95,17 +126,35 @@ class PathValidator:
         return resolved
     
     def is_binary(self, path: Path, sample_size: int = 8192) -> bool:
-        """Check if a file appears to be binary."""
+        """
+        Check if a file appears to be binary.
+        
+        Results are cached per (path, mtime, size), so repeat reads of an
+        unchanged file skip the sniff.
+        """
         try:
-            with open(path, "rb") as f:
-                chunk = f.read(sample_size)
-                # Look for null bytes (common in binary files)
-                if b"\x00" in chunk:
-                    return True
-                # Check for high ratio of non-text bytes
-                text_chars = bytearray({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)))
-                non_text = sum(1 for b in chunk if b not in text_chars)
-                return non_text / len(chunk) > 0.3 if chunk else False
-        except (OSError, IOError):
+            st = os.stat(path)
+        except OSError:
             return False
+        return _sniff_binary(str(path), st.st_mtime_ns, st.st_size, sample_size)
+
 
+@functools.lru_cache(maxsize=1024)
+def _sniff_binary(path: str, mtime_ns: int, size: int, sample_size: int) -> bool:
+    """Sniff the head of a file; mtime_ns and size only key the cache."""
+    # Unbuffered read: one open/read/close for a single sample
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+        try:
+            chunk = os.read(fd, sample_size)
+        finally:
+            os.close(fd)
+    except OSError:
+        return False
+    
+    # Look for null bytes (common in binary files)
+    if b"\x00" in chunk:
+        return True
+    # Check for high ratio of non-text bytes
+    non_text = len(chunk.translate(None, _TEXT_BYTES))
+    return non_text / len(chunk) > 0.3 if chunk else False
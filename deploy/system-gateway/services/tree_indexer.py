@@ -5,13 +5,17 @@ Maintains an index of the workspace filesystem for efficient directory
 listing without scanning on every request.
 """
 
+import fnmatch
 import logging
 import os
+import queue
+import re
 import sqlite3
+import stat
 import threading
 import time
 from pathlib import Path
-from typing import Any, List, Optional
+from typing import Any, Iterator, List, Optional
 
 from watchdog.events import FileSystemEventHandler, FileSystemEvent
 from watchdog.observers import Observer
@@ -20,44 +24,79 @@ from config import settings
 
 logger = logging.getLogger(__name__)
 
+# SQLite's name for a private in-memory database
+IN_MEMORY_DB = ":memory:"
+
 
 class TreeIndexer(FileSystemEventHandler):
     """
     Indexes workspace filesystem with incremental updates via inotify.
     
-    Uses SQLite for storage (in tmpfs for speed, rebuilt on container restart).
+    Uses SQLite for storage (in memory by default, or a tmpfs file; either
+    way rebuilt on container restart).
     """
     
     def __init__(self, workspace_root: str):
         self.workspace_root = Path(workspace_root)
+        # Watchdog reports absolute path strings; this prefix turns them
+        # into index paths without building Path objects per event
+        self._root_prefix = os.path.join(str(self.workspace_root), "")
         self.db_path = settings.index_db_path
         self.debounce_ms = settings.index_update_debounce_ms
         
         self._observer: Optional[Observer] = None
-        self._lock = threading.Lock()
-        self._pending_updates: set[str] = set()
-        self._debounce_timer: Optional[threading.Timer] = None
         
-        self._init_database()
+        # Watchdog callbacks only enqueue paths (None asks the consumer to
+        # exit); one consumer thread batches them and flushes each batch
+        # once no new path has arrived for a full debounce interval
+        self._update_queue: queue.SimpleQueue[Optional[str]] = queue.SimpleQueue()
+        self._update_thread: Optional[threading.Thread] = None
+        
+        # One connection for the indexer's lifetime, shared by request
+        # handlers and the update thread; _db_lock serializes its use.
+        # For an in-memory index this connection is also what keeps it alive.
+        self._db_lock = threading.Lock()
+        self._conn = self._init_database()
     
-    def _init_database(self) -> None:
-        """Initialize SQLite database schema."""
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+    def _init_database(self) -> sqlite3.Connection:
+        """Open the index database and initialize its schema."""
+        if self.db_path != IN_MEMORY_DB:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        
+        # Autocommit mode: transactions are opened explicitly where needed
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        
+        # The index is disposable (rebuilt on every start), so trade
+        # durability for speed: no fsyncs, no shared-lock traffic.
+        # An in-memory database ignores the journal settings.
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA locking_mode=EXCLUSIVE")
+        conn.execute("PRAGMA cache_size=-32000")
+        # Paths are case-sensitive; keep any LIKE filters consistent with that
+        conn.execute("PRAGMA case_sensitive_like=ON")
         
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS files (
-                    path TEXT PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    type TEXT NOT NULL,
-                    size INTEGER,
-                    mtime REAL,
-                    depth INTEGER NOT NULL
-                )
-            """)
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_depth ON files(depth)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_type ON files(type)")
-            conn.commit()
+        # WITHOUT ROWID clusters rows on path, so each path is stored once
+        # rather than in both the table and a separate primary-key index
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                type TEXT NOT NULL,
+                size INTEGER,
+                mtime REAL,
+                depth INTEGER NOT NULL
+            ) WITHOUT ROWID
+        """)
+        # Covers get_structure listings in ORDER BY order, so they need no
+        # table lookups and no sort; subtree lookups range-scan the primary key
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_listing ON files(type DESC, path, depth, name, size)"
+        )
+        # Covers the per-type totals
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_type ON files(type)")
+        return conn
     
     def start(self) -> None:
         """Start filesystem monitoring and initial indexing."""
@@ -66,6 +105,11 @@ class TreeIndexer(FileSystemEventHandler):
         # Initial full index
         self._full_reindex()
         
+        self._update_thread = threading.Thread(
+            target=self._consume_updates, name="tree-indexer-updates", daemon=True
+        )
+        self._update_thread.start()
+        
         # Start watchdog observer
         self._observer = Observer()
         self._observer.schedule(self, str(self.workspace_root), recursive=True)
@@ -74,12 +118,18 @@ class TreeIndexer(FileSystemEventHandler):
         logger.info("Tree indexer started")
     
     def stop(self) -> None:
-        """Stop filesystem monitoring."""
+        """Stop filesystem monitoring and wait for watcher threads to exit."""
         if self._observer:
             self._observer.stop()
             self._observer.join(timeout=5)
-        if self._debounce_timer:
-            self._debounce_timer.cancel()
+            self._observer = None
+        if self._update_thread:
+            self._update_queue.put(None)
+            self._update_thread.join(timeout=5)
+            self._update_thread = None
+        with self._db_lock:
+            self._conn.execute("PRAGMA optimize")
+            self._conn.close()
         logger.info("Tree indexer stopped")
     
     def _full_reindex(self) -> None:
@@ -87,41 +137,59 @@ class TreeIndexer(FileSystemEventHandler):
         logger.info("Starting full reindex...")
         start = time.time()
         
-        entries = []
-        for root, dirs, files in os.walk(self.workspace_root):
-            root_path = Path(root)
-            rel_root = root_path.relative_to(self.workspace_root)
-            depth = len(rel_root.parts)
-            
-            # Skip hidden directories
-            dirs[:] = [d for d in dirs if not d.startswith(".")]
-            
-            for d in dirs:
-                dir_path = root_path / d
-                rel_path = str(rel_root / d) if str(rel_root) != "." else d
-                entries.append((rel_path, d, "dir", None, None, depth + 1))
-            
-            for f in files:
-                if f.startswith("."):
-                    continue
-                file_path = root_path / f
-                rel_path = str(rel_root / f) if str(rel_root) != "." else f
-                try:
-                    stat = file_path.stat()
-                    entries.append((rel_path, f, "file", stat.st_size, stat.st_mtime, depth + 1))
-                except OSError:
-                    continue
+        # Collected before taking the database lock, so readers are not
+        # blocked while the filesystem is walked
+        entries = list(self._walk())
         
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("DELETE FROM files")
-            conn.executemany(
+        with self._db_lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("DELETE FROM files")
+            self._conn.executemany(
                 "INSERT INTO files (path, name, type, size, mtime, depth) VALUES (?, ?, ?, ?, ?, ?)",
                 entries
             )
-            conn.commit()
         
         logger.info(f"Indexed {len(entries)} entries in {time.time() - start:.2f}s")
 
+    def _walk(self) -> Iterator[tuple]:
+        """
+        Yield index rows for every non-hidden entry under the workspace.
+        
+        Mirrors os.walk: symlinked directories are listed but not descended
+        into, and unreadable directories or broken links are skipped.
+        """
+        stack = [(str(self.workspace_root), "", 1)]
+        while stack:
+            dir_path, rel_root, depth = stack.pop()
+            try:
+                scanner = os.scandir(dir_path)
+            except OSError:
+                continue
+            
+            with scanner:
+                for entry in scanner:
+                    name = entry.name
+                    if name.startswith("."):
+                        continue
+                    rel_path = f"{rel_root}/{name}" if rel_root else name
+                    
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    
+                    if is_dir:
+                        yield (rel_path, name, "dir", None, None, depth)
+                        if not entry.is_symlink():
+                            stack.append((entry.path, rel_path, depth + 1))
+                        continue
+                    
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    yield (rel_path, name, "file", st.st_size, st.st_mtime, depth)
+
     def get_structure(
         self,
         path: str = "",
@@ -141,53 +209,52 @@ class TreeIndexer(FileSystemEventHandler):
         Returns:
             Dictionary with tree structure and stats
         """
-        import fnmatch
-
         depth = max(1, min(5, depth))
         base_path = path.strip("/") if path else ""
-        base_depth = len(Path(base_path).parts) if base_path else 0
+        base_depth = base_path.count("/") + 1 if base_path else 0
         max_depth = base_depth + depth
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        conditions = ["depth <= ?"]
+        params: list[Any] = [max_depth]
+        if base_path:
+            # Subtree as a primary-key range: '0' sorts right after '/'
+            conditions.append("(path = ? OR (path >= ? AND path < ?))")
+            params += [base_path, f"{base_path}/", f"{base_path}0"]
+        if not include_hidden:
+            conditions.append("name NOT LIKE '.%'")
 
-            if base_path:
-                query = """
-                    SELECT path, name, type, size, depth
-                    FROM files
-                    WHERE (path = ? OR path LIKE ?) AND depth <= ?
-                    ORDER BY type DESC, path
-                """
-                cursor = conn.execute(query, (base_path, f"{base_path}/%", max_depth))
-            else:
-                query = """
-                    SELECT path, name, type, size, depth
-                    FROM files
-                    WHERE depth <= ?
-                    ORDER BY type DESC, path
-                """
-                cursor = conn.execute(query, (max_depth,))
+        # '*' and '?' mean the same in GLOB and fnmatch; bracket expressions
+        # differ ([!...] vs [^...]), so those patterns are matched in Python
+        name_filter = None
+        if pattern and "[" not in pattern:
+            conditions.append("name GLOB ?")
+            params.append(pattern)
+        elif pattern:
+            name_filter = re.compile(fnmatch.translate(pattern)).match
+
+        query = f"""
+            SELECT path, name, type, size
+            FROM files
+            WHERE {" AND ".join(conditions)}
+            ORDER BY type DESC, path
+        """
 
-            entries = []
-            for row in cursor:
-                name = row["name"]
-                if not include_hidden and name.startswith("."):
-                    continue
-                if pattern and not fnmatch.fnmatch(name, pattern):
-                    continue
+        with self._db_lock:
+            conn = self._conn
+            rows = conn.execute(query, params).fetchall()
 
-                entry = {
-                    "path": row["path"],
-                    "name": name,
-                    "type": row["type"]
-                }
-                if row["type"] == "file" and row["size"] is not None:
-                    entry["size"] = row["size"]
-                entries.append(entry)
+            entries = [
+                {"path": entry_path, "name": name, "type": entry_type, "size": size}
+                if entry_type == "file" and size is not None
+                else {"path": entry_path, "name": name, "type": entry_type}
+                for entry_path, name, entry_type, size in rows
+                if name_filter is None or name_filter(name)
+            ]
 
-            # Get total counts
-            total_files = conn.execute("SELECT COUNT(*) FROM files WHERE type='file'").fetchone()[0]
-            total_dirs = conn.execute("SELECT COUNT(*) FROM files WHERE type='dir'").fetchone()[0]
+            # Get total counts in one scan
+            total_files, total_dirs = conn.execute(
+                "SELECT COALESCE(SUM(type = 'file'), 0), COALESCE(SUM(type = 'dir'), 0) FROM files"
+            ).fetchone()
 
         return {
             "root": str(self.workspace_root / base_path) if base_path else str(self.workspace_root),
@@ -217,53 +284,69 @@ class TreeIndexer(FileSystemEventHandler):
 
     def _queue_update(self, path: str) -> None:
         """Queue a path for index update with debouncing."""
-        with self._lock:
-            self._pending_updates.add(path)
-            if self._debounce_timer:
-                self._debounce_timer.cancel()
-            self._debounce_timer = threading.Timer(
-                self.debounce_ms / 1000.0,
-                self._flush_updates
-            )
-            self._debounce_timer.start()
+        # Queue index paths only for what a full reindex would index: inside
+        # the workspace and with no hidden component (e.g. .git/objects/...)
+        rel = path.removeprefix(self._root_prefix)
+        if rel == path or not rel or rel.startswith(".") or "/." in rel:
+            return
+        self._update_queue.put(rel)
 
-    def _flush_updates(self) -> None:
-        """Process pending updates."""
-        with self._lock:
-            paths = self._pending_updates.copy()
-            self._pending_updates.clear()
+    def _consume_updates(self) -> None:
+        """Batch queued index paths until each burst goes quiet, then flush them."""
+        delay = self.debounce_ms / 1000.0
+        while True:
+            path = self._update_queue.get()
+            if path is None:
+                return
+            
+            # Keep collecting while paths are still arriving
+            paths = {path}
+            while True:
+                try:
+                    path = self._update_queue.get(timeout=delay)
+                except queue.Empty:
+                    break
+                if path is None:
+                    return
+                paths.add(path)
 
-        if not paths:
-            return
+            # This is the only consumer: an uncaught error would stop index
+            # updates for good, so log it and carry on with the next batch
+            try:
+                self._flush_updates(paths)
+            except Exception:
+                logger.exception(f"Failed to apply {len(paths)} index updates")
 
-        # For simplicity, just reindex affected paths
-        # A more sophisticated implementation would do incremental updates
-        for path_str in paths:
-            path = Path(path_str)
+    def _flush_updates(self, paths: set[str]) -> None:
+        """Apply a batch of changed index paths to the index."""
+        # Classify every path with a single stat, outside the database lock
+        upserts: list[tuple] = []
+        deletes: list[tuple[str, str, str]] = []
+        root_prefix = self._root_prefix
+        for rel in paths:
             try:
-                rel_path = path.relative_to(self.workspace_root)
-            except ValueError:
+                st = os.stat(root_prefix + rel)
+            except OSError:
+                deletes.append((rel, f"{rel}/", f"{rel}0"))
                 continue
 
-            with sqlite3.connect(self.db_path) as conn:
-                if path.exists():
-                    # Update or insert
-                    stat = path.stat() if path.is_file() else None
-                    conn.execute(
-                        """INSERT OR REPLACE INTO files (path, name, type, size, mtime, depth)
-                           VALUES (?, ?, ?, ?, ?, ?)""",
-                        (
-                            str(rel_path),
-                            path.name,
-                            "dir" if path.is_dir() else "file",
-                            stat.st_size if stat else None,
-                            stat.st_mtime if stat else None,
-                            len(rel_path.parts)
-                        )
-                    )
-                else:
-                    # Delete
-                    conn.execute("DELETE FROM files WHERE path = ? OR path LIKE ?",
-                                (str(rel_path), f"{rel_path}/%"))
-                conn.commit()
+            name = rel.rpartition("/")[2]
+            depth = rel.count("/") + 1
+            if stat.S_ISDIR(st.st_mode):
+                upserts.append((rel, name, "dir", None, None, depth))
+            elif stat.S_ISREG(st.st_mode):
+                upserts.append((rel, name, "file", st.st_size, st.st_mtime, depth))
+            else:
+                upserts.append((rel, name, "file", None, None, depth))
 
+        # Apply the whole batch in one transaction, so a burst costs one commit
+        with self._db_lock, self._conn as conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "DELETE FROM files WHERE path = ? OR (path >= ? AND path < ?)", deletes
+            )
+            conn.executemany(
+                """INSERT OR REPLACE INTO files (path, name, type, size, mtime, depth)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                upserts
+            )
@@ -5,14 +5,27 @@ Tests /structure, /read, /edit, /execute endpoints including
 path traversal prevention, timeout handling, and error responses.
 """
 
+import asyncio
 import os
 import tempfile
+import time
+from contextlib import ExitStack
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
 import pytest
 from fastapi.testclient import TestClient
 
+# Gateway modules that bind `settings` at import time
+_SETTINGS_MODULES = (
+    "main",
+    "routers.execute",
+    "routers.files",
+    "services.path_validator",
+    "services.tree_indexer",
+)
+
+
 # Mock settings before importing app
 @pytest.fixture(autouse=True)
 def mock_settings():
@@ -28,9 +41,20 @@ def mock_settings():
         mock_config.index_update_debounce_ms = 100
         mock_config.log_level = "INFO"
         mock_config.workspace_path = Path(tmpdir)
+        mock_config.workspace_path_resolved = Path(tmpdir).resolve()
 
         with patch("config.settings", mock_config):
-            yield tmpdir, mock_config
+            import main  # noqa: F401 - binds settings into every gateway module
+
+            # Modules keep the settings object they imported, so the first
+            # test's mock (and its deleted workspace) would otherwise stick
+            with ExitStack() as stack:
+                for module in _SETTINGS_MODULES:
+                    stack.enter_context(patch(f"{module}.settings", mock_config))
+                stack.enter_context(
+                    patch.dict("routers.execute._BASE_ENV", {"HOME": tmpdir, "PWD": tmpdir})
+                )
+                yield tmpdir, mock_config
 
 
 @pytest.fixture
@@ -69,6 +93,15 @@ def client(test_workspace):
             yield c
 
 
+def _process_alive(pid: int) -> bool:
+    """Whether a process exists and has not exited (zombies count as exited)."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rpartition(")")[2].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
 class TestHealthEndpoint:
     """Tests for /health endpoint."""
 
@@ -185,6 +218,43 @@ class TestExecuteEndpoint:
         data = response.json()
         assert data.get("timed_out") is True or data.get("exit_code") != 0
 
+    def test_large_output_truncated(self, client):
+        """Output past the cap is truncated and flagged."""
+        from routers import execute
+
+        # Cap output at 1 KB (max_output_lines * 100), so a small command overflows it
+        with patch.object(execute.settings, "max_output_lines", 10):
+            response = client.post("/execute", json={"command": "yes | head -c 5000"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["truncated"] is True
+        assert data["stdout"].endswith("... (output truncated)")
+        assert len(data["stdout"]) < 5000
+
+    def test_cancelled_execute_kills_process_group(self, test_workspace):
+        """A cancelled request kills the command and everything it spawned."""
+        from routers.execute import ExecuteRequest, execute_command
+
+        pid_file = Path(test_workspace) / "child.pid"
+        body = ExecuteRequest(command="sleep 30 & echo $! > child.pid; wait", timeout=30)
+
+        async def cancel_mid_command():
+            task = asyncio.create_task(execute_command(MagicMock(), body))
+            while not (pid_file.exists() and pid_file.read_text().strip()):
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return int(pid_file.read_text())
+
+        child_pid = asyncio.run(cancel_mid_command())
+
+        # The orphaned sleep is gone, or a zombie waiting for init to reap it
+        deadline = time.monotonic() + 5
+        while _process_alive(child_pid) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert not _process_alive(child_pid)
+
     def test_execute_blocked_command(self, client):
         """Execute blocks dangerous commands."""
         response = client.post("/execute", json={"command": "sudo rm -rf /"})
@@ -0,0 +1,217 @@
+"""
+Unit tests for the System Gateway tree indexer.
+
+Drives full reindexing, incremental flushes, and get_structure filtering
+(base path subtrees, depth limits, GLOB and bracket patterns) against a
+real in-memory index.
+"""
+
+import shutil
+import threading
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from services.tree_indexer import TreeIndexer
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    """Create a workspace whose names exercise the subtree range bounds."""
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "main.py").write_text("print('a')\n")
+    (tmp_path / "a" / "test_main.py").write_text("assert True\n")
+    (tmp_path / "a" / "deep").mkdir()
+    (tmp_path / "a" / "deep" / "inner.py").write_text("")
+    # Siblings that sort right around "a/": "a-b" before it, "a0" at its upper bound
+    (tmp_path / "a-b").mkdir()
+    (tmp_path / "a-b" / "other.py").write_text("")
+    (tmp_path / "a0").mkdir()
+    (tmp_path / "a0" / "zero.py").write_text("")
+    (tmp_path / "readme.md").write_text("# readme\n")
+    (tmp_path / ".hidden").write_text("")
+    return tmp_path
+
+
+@pytest.fixture
+def indexer(workspace):
+    """Create an indexed TreeIndexer over the workspace, without the watcher."""
+    mock_config = MagicMock()
+    mock_config.index_db_path = ":memory:"
+    mock_config.index_update_debounce_ms = 10
+
+    with patch("services.tree_indexer.settings", mock_config):
+        indexer = TreeIndexer(str(workspace))
+    indexer._full_reindex()
+    yield indexer
+    indexer._conn.close()
+
+
+def paths(result):
+    """Return the set of paths in a get_structure result."""
+    return {entry["path"] for entry in result["tree"]}
+
+
+class TestGetStructure:
+    """Tests for index queries."""
+
+    def test_root_listing(self, indexer):
+        """Root listing returns visible entries up to the requested depth."""
+        result = indexer.get_structure(depth=1)
+
+        assert paths(result) == {"a", "a-b", "a0", "readme.md"}
+        assert result["stats"]["total_dirs"] == 4
+        assert result["stats"]["total_files"] == 6
+
+    def test_listing_order(self, indexer):
+        """Entries are grouped by type (files first), each group ordered by path."""
+        tree = indexer.get_structure(depth=1)["tree"]
+
+        assert [entry["path"] for entry in tree] == ["readme.md", "a", "a-b", "a0"]
+        assert tree[0]["size"] == len("# readme\n")
+
+    def test_base_path_excludes_siblings(self, indexer):
+        """A base path returns only its own subtree, not prefix-sharing siblings."""
+        result = indexer.get_structure(path="a", depth=5)
+
+        assert paths(result) == {"a", "a/main.py", "a/test_main.py", "a/deep", "a/deep/inner.py"}
+        assert result["root"].endswith("/a")
+
+    def test_depth_is_relative_to_base_path(self, indexer):
+        """Depth counts from the base path, not the workspace root."""
+        result = indexer.get_structure(path="a/", depth=1)
+
+        assert paths(result) == {"a", "a/main.py", "a/test_main.py", "a/deep"}
+
+    def test_glob_pattern(self, indexer):
+        """Patterns without brackets filter names through SQLite GLOB."""
+        result = indexer.get_structure(path="a", depth=5, pattern="*.py")
+
+        assert paths(result) == {"a/main.py", "a/test_main.py", "a/deep/inner.py"}
+
+    def test_glob_pattern_is_case_sensitive(self, indexer):
+        """GLOB filtering matches case like fnmatch does on Linux."""
+        result = indexer.get_structure(depth=5, pattern="*.PY")
+
+        assert result["tree"] == []
+
+    def test_bracket_pattern(self, indexer):
+        """Bracket patterns use fnmatch semantics, including [!...] negation."""
+        result = indexer.get_structure(path="a", depth=5, pattern="[!t]*.py")
+
+        assert paths(result) == {"a/main.py", "a/deep/inner.py"}
+
+    def test_hidden_entries(self, indexer, workspace):
+        """Hidden entries are skipped by the walk and by include_hidden=False."""
+        assert ".hidden" not in paths(indexer.get_structure(depth=1, include_hidden=True))
+
+        (workspace / ".env").write_text("")
+        indexer._flush_updates({".env"})
+
+        assert ".env" not in paths(indexer.get_structure(depth=1))
+        assert ".env" in paths(indexer.get_structure(depth=1, include_hidden=True))
+
+
+class TestFlushUpdates:
+    """Tests for incremental index updates."""
+
+    def test_created_entries_are_upserted(self, indexer, workspace):
+        """New files and directories are added with their type, size and depth."""
+        (workspace / "new").mkdir()
+        (workspace / "new" / "file.txt").write_text("12345")
+
+        indexer._flush_updates({"new", "new/file.txt"})
+
+        tree = {entry["path"]: entry for entry in indexer.get_structure(path="new")["tree"]}
+        assert tree["new"] == {"path": "new", "name": "new", "type": "dir"}
+        assert tree["new/file.txt"] == {
+            "path": "new/file.txt", "name": "file.txt", "type": "file", "size": 5
+        }
+
+    def test_modified_file_is_replaced(self, indexer, workspace):
+        """A changed file replaces its existing row rather than duplicating it."""
+        (workspace / "readme.md").write_text("longer content\n")
+
+        indexer._flush_updates({"readme.md"})
+
+        tree = indexer.get_structure(depth=1, pattern="readme.md")["tree"]
+        assert tree == [
+            {"path": "readme.md", "name": "readme.md", "type": "file", "size": len("longer content\n")}
+        ]
+
+    def test_deleted_file_is_removed(self, indexer, workspace):
+        """A path that no longer exists is removed from the index."""
+        (workspace / "a" / "main.py").unlink()
+
+        indexer._flush_updates({"a/main.py"})
+
+        assert "a/main.py" not in paths(indexer.get_structure(path="a"))
+        assert "a/test_main.py" in paths(indexer.get_structure(path="a"))
+
+    def test_deleted_dir_removes_subtree_only(self, indexer, workspace):
+        """Deleting a directory drops its descendants but not prefix-sharing siblings."""
+        shutil.rmtree(workspace / "a")
+
+        indexer._flush_updates({"a"})
+
+        assert paths(indexer.get_structure(depth=5)) == {
+            "a-b", "a-b/other.py", "a0", "a0/zero.py", "readme.md"
+        }
+
+    def test_mixed_batch(self, indexer, workspace):
+        """Creates and deletes in one batch are applied together."""
+        (workspace / "a0" / "zero.py").unlink()
+        (workspace / "a-b" / "added.py").write_text("")
+
+        indexer._flush_updates({"a0/zero.py", "a-b/added.py"})
+
+        assert paths(indexer.get_structure(depth=5, pattern="*.py")) == {
+            "a/main.py", "a/test_main.py", "a/deep/inner.py", "a-b/other.py", "a-b/added.py"
+        }
+
+
+class TestQueueUpdate:
+    """Tests for watchdog path filtering."""
+
+    def test_paths_outside_workspace_or_hidden_are_ignored(self, indexer, workspace):
+        """Only visible paths inside the workspace are queued."""
+        root = str(workspace)
+        for path in ("/elsewhere/file.py", root, f"{root}/.git/objects/ab", f"{root}/a/.cache"):
+            indexer._queue_update(path)
+        indexer._queue_update(f"{root}/a/main.py")
+
+        assert indexer._update_queue.get_nowait() == "a/main.py"
+        assert indexer._update_queue.empty()
+
+
+class TestConsumeUpdates:
+    """Tests for the update consumer thread."""
+
+    def test_failed_flush_does_not_stop_updates(self, indexer, workspace):
+        """A batch that fails to apply is logged and later batches still land."""
+        failed = threading.Event()
+        flushed = threading.Event()
+        flush = indexer._flush_updates
+
+        def flaky_flush(paths):
+            if not failed.is_set():
+                failed.set()
+                raise RuntimeError("disk I/O error")
+            flush(paths)
+            flushed.set()
+
+        thread = threading.Thread(target=indexer._consume_updates, daemon=True)
+        with patch.object(indexer, "_flush_updates", flaky_flush):
+            thread.start()
+            indexer._update_queue.put("lost.txt")
+            assert failed.wait(timeout=5)
+
+            (workspace / "kept.txt").write_text("")
+            indexer._update_queue.put("kept.txt")
+            assert flushed.wait(timeout=5)
+
+            indexer._update_queue.put(None)
+            thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert "kept.txt" in paths(indexer.get_structure(depth=1))
@@ -4,7 +4,8 @@ LT_Memory Module - Long-term memory system for MIRA.
 Factory-based initialization with explicit dependency management.
 """
 import logging
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
 
 from config.config import LTMemoryConfig
 from lt_memory.factory import LTMemoryFactory, get_lt_memory_factory
@@ -30,11 +31,11 @@ from lt_memory.models import (
 logger = logging.getLogger(__name__)
 
 
-# Cached extraction LLM routing config
-_extraction_llm_config: Optional[Dict[str, Any]] = None
+# Cached extraction LLM routing config (read-only, shared by all callers)
+_extraction_llm_config: Optional[Mapping[str, Any]] = None
 
 
-def get_extraction_llm_kwargs() -> Dict[str, Any]:
+def get_extraction_llm_kwargs() -> Mapping[str, Any]:
     """
     Get LLM routing kwargs for LT Memory extraction operations.
 
@@ -42,13 +43,13 @@ def get_extraction_llm_kwargs() -> Dict[str, Any]:
     suitable for passing to LLMProvider.generate_response().
 
     Returns:
-        Dict with endpoint_url, model_override, api_key_override if configured,
-        or empty dict if extraction config not available.
+        Read-only mapping with endpoint_url, model_override, api_key_override
+        if configured, or an empty mapping if extraction config not available
     """
     global _extraction_llm_config
 
     if _extraction_llm_config is not None:
-        return _extraction_llm_config.copy()
+        return _extraction_llm_config
 
     try:
         from utils.user_context import get_internal_llm
@@ -60,12 +61,13 @@ def get_extraction_llm_kwargs() -> Dict[str, Any]:
             if extraction_config.api_key_name else None
         )
 
-        _extraction_llm_config = {
+        config = {
             "endpoint_url": extraction_config.endpoint_url,
             "model_override": extraction_config.model,
         }
         if api_key:
-            _extraction_llm_config["api_key_override"] = api_key
+            config["api_key_override"] = api_key
+        _extraction_llm_config = MappingProxyType(config)
 
         logger.info(
             f"Extraction LLM routing: {extraction_config.model} via {extraction_config.endpoint_url}"
@@ -74,9 +76,9 @@ def get_extraction_llm_kwargs() -> Dict[str, Any]:
         logger.warning(
             "No 'extraction' entry in internal_llm table - LT Memory will use default LLMProvider"
         )
-        _extraction_llm_config = {}
+        _extraction_llm_config = MappingProxyType({})
 
-    return _extraction_llm_config.copy()
+    return _extraction_llm_config
 
 __all__ = [
     # Factory
@@ -285,12 +285,12 @@ def cmd_check(args: argparse.Namespace) -> int:
             raise RuntimeError(f"Failed to decrypt secrets: {result.stderr}")
 
         import yaml
-        secrets = yaml.safe_load(result.stdout)
+        secrets = yaml.load(result.stdout, Loader=yaml.CSafeLoader)
         print_success("Secrets file decrypted successfully")
 
         # Step 3: Validate against schema
         with open(SCHEMA_PATH) as f:
-            schema = yaml.safe_load(f)
+            schema = yaml.load(f, Loader=yaml.CSafeLoader)
 
         missing = []
         for key, spec in schema.get("secrets", {}).items():
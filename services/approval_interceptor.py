@@ -28,14 +28,35 @@ REJECT_PATTERNS = [
     r"^no,?\s*thanks$", r"^no,?\s*don'?t$", r"^nevermind$", r"^never\s*mind$",
 ]
 
+# A pattern that is just an anchored plain phrase, like r"^go ahead$"
+_LITERAL_PATTERN = re.compile(r"\^([a-z ]+)\$")
 
-def _matches_patterns(text: str, patterns: list[str]) -> bool:
-    """Check if text matches any of the given patterns."""
-    text_lower = text.lower().strip()
+
+def _compile_patterns(patterns: list[str]) -> Tuple[frozenset[str], re.Pattern]:
+    """
+    Split anchored patterns into plain phrases and one compiled alternation.
+
+    Replies are nearly always a single word, so those are answered with a set
+    lookup; only the remaining expressions go through the regex.
+    """
+    literals = set()
+    expressions = []
     for pattern in patterns:
-        if re.match(pattern, text_lower, re.IGNORECASE):
-            return True
-    return False
+        match = _LITERAL_PATTERN.fullmatch(pattern)
+        if match:
+            literals.add(match.group(1))
+        else:
+            expressions.append(f"(?:{pattern})")
+    return frozenset(literals), re.compile("|".join(expressions), re.IGNORECASE)
+
+
+_APPROVE_LITERALS, _APPROVE_RE = _compile_patterns(APPROVE_PATTERNS)
+_REJECT_LITERALS, _REJECT_RE = _compile_patterns(REJECT_PATTERNS)
+
+
+def _matches_patterns(text: str, literals: frozenset[str], regex: re.Pattern) -> bool:
+    """Check if normalized text is one of the literals or matches the regex."""
+    return text in literals or regex.match(text) is not None
 
 
 async def check_for_approval_response(
@@ -60,8 +81,9 @@ async def check_for_approval_response(
         return None
     
     # Check if message matches approval/rejection patterns
-    is_approve = _matches_patterns(message, APPROVE_PATTERNS)
-    is_reject = _matches_patterns(message, REJECT_PATTERNS)
+    text = message.lower().strip()
+    is_approve = _matches_patterns(text, _APPROVE_LITERALS, _APPROVE_RE)
+    is_reject = _matches_patterns(text, _REJECT_LITERALS, _REJECT_RE)
     
     if not is_approve and not is_reject:
         return None
@@ -5,20 +5,34 @@ Logs all gateway operations with user_id, operation type, path/command,
 result, and timestamp. Uses append-only logging for security.
 """
 
-import json
+import atexit
 import logging
-from datetime import datetime
+import os
+import queue
+import threading
+from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
 from typing import Any, Dict, Optional
 
-from pydantic import BaseModel, Field
+import orjson
 
 from config.config_manager import config
 from utils.timezone_utils import utc_now, format_utc_iso
 
 logger = logging.getLogger(__name__)
 
+# Limits on one writev from the writer thread; the entry count also has to
+# stay within the kernel's cap on buffers per call
+_MAX_BATCH = min(1000, os.sysconf("SC_IOV_MAX"))
+_MAX_BATCH_BYTES = 64 * 1024
+
+# After this many bytes the writer syncs the file and drops its pages from
+# the page cache, so a busy log does not build up cached and dirty pages.
+# Linux only; other platforms leave caching to the kernel.
+_RELEASE_INTERVAL_BYTES = 64 * 1024 * 1024
+_HAS_FADVISE = hasattr(os, "posix_fadvise")
+
 
 class OperationType(str, Enum):
     """Types of gateway operations."""
@@ -32,16 +46,21 @@ class OperationType(str, Enum):
     APPROVAL_EXPIRED = "approval_expired"
 
 
-class AuditEntry(BaseModel):
+# Value -> member map for resolving free-form operation names in one lookup
+_OP_BY_VALUE = {op.value: op for op in OperationType}
+
+
+@dataclass(slots=True)
+class AuditEntry:
     """Single audit log entry."""
-    timestamp: str = Field(..., description="ISO timestamp of operation")
-    user_id: str = Field(..., description="User who performed operation")
-    operation: OperationType = Field(..., description="Type of operation")
-    target: str = Field(..., description="Path or command that was targeted")
-    result: str = Field(..., description="Result: success, failure, blocked, pending")
-    details: Dict[str, Any] = Field(default_factory=dict, description="Additional details")
-    sensitivity: Optional[str] = Field(default=None, description="Sensitivity level if applicable")
-    approval_id: Optional[str] = Field(default=None, description="Approval ID if HITL was involved")
+    timestamp: str                        # ISO timestamp of operation
+    user_id: str                          # User who performed operation
+    operation: OperationType              # Type of operation
+    target: str                           # Path or command that was targeted
+    result: str                           # Result: success, failure, blocked, pending
+    details: Dict[str, Any] = field(default_factory=dict)  # Additional details
+    sensitivity: Optional[str] = None     # Sensitivity level if applicable
+    approval_id: Optional[str] = None     # Approval ID if HITL was involved
 
 
 class GatewayAuditLogger:
@@ -49,6 +68,8 @@ class GatewayAuditLogger:
     Append-only audit logger for gateway operations.
     
     Writes to a dedicated log file in JSON Lines format for easy parsing.
+    Entries are queued by log() and appended in batches by a background
+    writer thread, so gateway operations never wait on file I/O.
     """
     
     def __init__(self, log_dir: Optional[Path] = None):
@@ -64,6 +85,101 @@ class GatewayAuditLogger:
         self.log_dir = log_dir
         self.log_dir.mkdir(parents=True, exist_ok=True)
         self.log_file = self.log_dir / "gateway_audit.jsonl"
+        
+        # None on the queue tells the writer thread to exit
+        self._queue: queue.SimpleQueue[Optional[bytes]] = queue.SimpleQueue()
+        # Raw O_APPEND descriptor: every write lands at the end of the file
+        # with no buffering layer or per-entry open/close
+        self._fd = os.open(
+            self.log_file,
+            os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_CLOEXEC,
+            0o640
+        )
+        if _HAS_FADVISE:
+            # Append-only and never read back by this process
+            os.posix_fadvise(self._fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        self._unreleased_bytes = 0
+        self._writer = threading.Thread(
+            target=self._write_loop,
+            daemon=True,
+            name="gateway-audit-writer"
+        )
+        self._entries_written = 0
+        self._batches_written = 0
+        self._writer.start()
+        self._closed = False
+        # Drain queued entries before the interpreter exits
+        atexit.register(self.close)
+    
+    def close(self) -> None:
+        """Write any queued entries, stop the writer thread and close the file."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        os.close(self._fd)
+    
+    def stats(self) -> Dict[str, float]:
+        """Counts of entries and batches written so far."""
+        entries = self._entries_written
+        batches = self._batches_written
+        return {
+            "entries_written": entries,
+            "batches_written": batches,
+            "avg_batch": entries / batches if batches else 0.0,
+        }
+    
+    def _write_loop(self) -> None:
+        """Append queued entries in batches until close() is called."""
+        while True:
+            line = self._queue.get()
+            batch: list[bytes] = []
+            size = 0
+            while line is not None:
+                batch.append(line)
+                size += len(line)
+                if len(batch) >= _MAX_BATCH or size >= _MAX_BATCH_BYTES:
+                    break
+                try:
+                    line = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            
+            if batch:
+                self._write_batch(batch, size)
+            if line is None:
+                return
+    
+    def _write_batch(self, lines: list[bytes], size: int) -> None:
+        """Append serialized entries to the file with one gathered write."""
+        try:
+            written = os.writev(self._fd, lines)
+            if written < size:
+                # Short write: finish the remainder from a contiguous copy
+                rest = memoryview(b"".join(lines))[written:]
+                while rest:
+                    rest = rest[os.write(self._fd, rest):]
+            self._entries_written += len(lines)
+            self._batches_written += 1
+            self._unreleased_bytes += size
+            if _HAS_FADVISE and self._unreleased_bytes >= _RELEASE_INTERVAL_BYTES:
+                self._release_written_pages()
+        except Exception as e:
+            # Log to standard logger if file write fails
+            logger.error(f"Failed to write audit log: {e}")
+            for line in lines:
+                logger.info(f"AUDIT: {line.decode().rstrip()}")
+    
+    def _release_written_pages(self) -> None:
+        """Flush written entries to disk and drop them from the page cache."""
+        self._unreleased_bytes = 0
+        try:
+            os.fdatasync(self._fd)
+            # Every page is clean after the sync, so advise over the whole file
+            os.posix_fadvise(self._fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError as e:
+            logger.warning(f"Failed to release audit log pages: {e}")
     
     def log(
         self,
@@ -87,6 +203,19 @@ class GatewayAuditLogger:
             sensitivity: Sensitivity level if applicable
             approval_id: Approval ID if HITL was involved
         """
+        self._emit(user_id, operation, target, result, details, sensitivity, approval_id)
+    
+    def _emit(
+        self,
+        user_id: str,
+        operation: OperationType,
+        target: str,
+        result: str,
+        details: Optional[Dict[str, Any]] = None,
+        sensitivity: Optional[str] = None,
+        approval_id: Optional[str] = None
+    ) -> None:
+        """Serialize and queue one entry; the log_* helpers call this positionally."""
         entry = AuditEntry(
             timestamp=format_utc_iso(utc_now()),
             user_id=user_id,
@@ -98,42 +227,28 @@ class GatewayAuditLogger:
             approval_id=approval_id
         )
         
-        # Append to log file (atomic write with newline)
-        try:
-            with open(self.log_file, "a", encoding="utf-8") as f:
-                f.write(entry.model_dump_json() + "\n")
-        except Exception as e:
-            # Log to standard logger if file write fails
-            logger.error(f"Failed to write audit log: {e}")
-            logger.info(f"AUDIT: {entry.model_dump_json()}")
+        # Queued for the writer thread, one JSON line per entry
+        self._queue.put(orjson.dumps(entry, default=str, option=orjson.OPT_APPEND_NEWLINE))
     
     def log_read_structure(self, user_id: str, path: str, success: bool) -> None:
         """Log a read_structure operation."""
-        self.log(
-            user_id=user_id,
-            operation=OperationType.READ_STRUCTURE,
-            target=path or "/",
-            result="success" if success else "failure"
+        self._emit(
+            user_id, OperationType.READ_STRUCTURE, path or "/",
+            "success" if success else "failure"
         )
     
     def log_read_file(self, user_id: str, path: str, success: bool, lines: int = 0) -> None:
         """Log a read_file operation."""
-        self.log(
-            user_id=user_id,
-            operation=OperationType.READ_FILE,
-            target=path,
-            result="success" if success else "failure",
-            details={"lines_read": lines}
+        self._emit(
+            user_id, OperationType.READ_FILE, path,
+            "success" if success else "failure", {"lines_read": lines}
         )
     
     def log_edit_file(self, user_id: str, path: str, success: bool, edits: int = 0) -> None:
         """Log an edit_file operation."""
-        self.log(
-            user_id=user_id,
-            operation=OperationType.EDIT_FILE,
-            target=path,
-            result="success" if success else "failure",
-            details={"edits_applied": edits}
+        self._emit(
+            user_id, OperationType.EDIT_FILE, path,
+            "success" if success else "failure", {"edits_applied": edits}
         )
     
     def log_execute(
@@ -145,22 +260,17 @@ class GatewayAuditLogger:
         duration_ms: int = 0
     ) -> None:
         """Log an execute operation."""
-        self.log(
-            user_id=user_id,
-            operation=OperationType.EXECUTE,
-            target=command,
-            result="success" if success else "failure",
-            details={"exit_code": exit_code, "duration_ms": duration_ms}
+        self._emit(
+            user_id, OperationType.EXECUTE, command,
+            "success" if success else "failure",
+            {"exit_code": exit_code, "duration_ms": duration_ms}
         )
     
     def log_blocked(self, user_id: str, operation: str, target: str, reason: str) -> None:
         """Log a blocked operation."""
-        self.log(
-            user_id=user_id,
-            operation=OperationType(operation) if operation in OperationType.__members__.values() else OperationType.EXECUTE,
-            target=target,
-            result="blocked",
-            details={"reason": reason}
+        self._emit(
+            user_id, _OP_BY_VALUE.get(operation, OperationType.EXECUTE), target,
+            "blocked", {"reason": reason}
         )
 
 
@@ -5,9 +5,11 @@ Stores user-specific gateway configuration like workspace paths,
 auto-approve patterns, and blocked paths in encrypted user storage.
 """
 
+import bisect
 import json
 import logging
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
 from pydantic import BaseModel, Field
 
@@ -61,22 +63,90 @@ CREDENTIAL_TYPE = "gateway_settings"
 SERVICE_NAME = "system_gateway"
 
 
-def get_user_gateway_settings(user_id: str) -> GatewayUserSettings:
+class _CachedSettings(NamedTuple):
+    """A user's loaded settings plus lookups derived from them."""
+    settings: GatewayUserSettings
+    expires_at: float                  # time.monotonic() deadline
+    auto_approve_roots: Tuple[str, ...]  # Sorted; none is a prefix of another
+    auto_approve_commands: Tuple[str, ...]  # Global + user, deduplicated
+    blocked_patterns: Tuple[str, ...]       # Global + user, deduplicated
+
+
+# user_id -> cached settings. Saves through this module drop the user's
+# entry; changes made by other processes show up within the TTL.
+_settings_cache: Dict[str, _CachedSettings] = {}
+
+
+def _prefix_roots(prefixes: List[str]) -> Tuple[str, ...]:
     """
-    Get gateway settings for a user.
+    Sort prefixes, dropping any that start with another prefix in the list.
+    
+    In the result, the only entry that can be a prefix of a string is the
+    greatest entry not above it, so prefix checks need one bisect.
+    """
+    roots: List[str] = []
+    for prefix in sorted(set(prefixes)):
+        if not roots or not prefix.startswith(roots[-1]):
+            roots.append(prefix)
+    return tuple(roots)
+
+
+def _cache_entry(settings: GatewayUserSettings, expires_at: float) -> _CachedSettings:
+    """Bundle settings with their derived lookups."""
+    gateway_config = config.system_gateway
+    return _CachedSettings(
+        settings=settings,
+        expires_at=expires_at,
+        auto_approve_roots=_prefix_roots(settings.auto_approve_dirs),
+        auto_approve_commands=tuple(
+            set(gateway_config.auto_approve_patterns + settings.auto_approve_commands)
+        ),
+        blocked_patterns=tuple(
+            set(gateway_config.blocked_patterns + settings.blocked_paths)
+        ),
+    )
+
+
+def _load_cached(user_id: str) -> _CachedSettings:
+    """
+    Load a user's settings, served from the in-process cache when fresh.
     
-    Returns user-specific settings merged with global defaults.
+    The returned settings are shared between callers and must not be mutated.
     """
+    now = time.monotonic()
+    hit = _settings_cache.get(user_id)
+    if hit and hit.expires_at > now:
+        return hit
+    
     cred_service = UserCredentialService(user_id)
     
     try:
         settings_json = cred_service.get_credential(CREDENTIAL_TYPE, SERVICE_NAME)
-        if settings_json:
-            return GatewayUserSettings(**json.loads(settings_json))
+        settings = (
+            GatewayUserSettings(**json.loads(settings_json))
+            if settings_json else GatewayUserSettings()
+        )
     except Exception as e:
+        # Not cached, so the next call retries the load
         logger.warning(f"Failed to load gateway settings for user {user_id}: {e}")
+        return _cache_entry(GatewayUserSettings(), now)
+    
+    ttl = config.system_gateway.settings_cache_ttl
+    entry = _cache_entry(settings, now + ttl)
+    if ttl > 0:
+        _settings_cache[user_id] = entry
+    return entry
+
+
+def get_user_gateway_settings(user_id: str) -> GatewayUserSettings:
+    """
+    Get gateway settings for a user.
     
-    return GatewayUserSettings()
+    Returns user-specific settings merged with global defaults. The result
+    is the caller's own copy, so it can be modified and passed to
+    save_user_gateway_settings().
+    """
+    return _load_cached(user_id).settings.model_copy(deep=True)
 
 
 def save_user_gateway_settings(user_id: str, settings: GatewayUserSettings) -> None:
@@ -87,6 +157,7 @@ def save_user_gateway_settings(user_id: str, settings: GatewayUserSettings) -> N
         SERVICE_NAME,
         settings.model_dump_json()
     )
+    _settings_cache.pop(user_id, None)
     logger.info(f"Saved gateway settings for user {user_id}")
 
 
@@ -94,33 +165,23 @@ def get_effective_auto_approve_commands(user_id: str) -> List[str]:
     """
     Get combined auto-approve commands from global config and user settings.
     """
-    global_patterns = config.system_gateway.auto_approve_patterns
-    user_settings = get_user_gateway_settings(user_id)
-    
-    # Combine and deduplicate
-    return list(set(global_patterns + user_settings.auto_approve_commands))
+    # Combined and deduplicated when the settings were loaded
+    return list(_load_cached(user_id).auto_approve_commands)
 
 
 def get_effective_blocked_patterns(user_id: str) -> List[str]:
     """
     Get combined blocked patterns from global config and user settings.
     """
-    global_patterns = config.system_gateway.blocked_patterns
-    user_settings = get_user_gateway_settings(user_id)
-    
-    # Combine and deduplicate
-    return list(set(global_patterns + user_settings.blocked_paths))
+    # Combined and deduplicated when the settings were loaded
+    return list(_load_cached(user_id).blocked_patterns)
 
 
 def is_path_in_auto_approve_dir(user_id: str, path: str) -> bool:
     """
     Check if a path is within a user's auto-approve directories.
     """
-    user_settings = get_user_gateway_settings(user_id)
-    
-    for auto_dir in user_settings.auto_approve_dirs:
-        if path.startswith(auto_dir) or path == auto_dir:
-            return True
-    
-    return False
+    roots = _load_cached(user_id).auto_approve_roots
+    index = bisect.bisect_right(roots, path) - 1
+    return index >= 0 and path.startswith(roots[index])
 
@@ -5,19 +5,23 @@ Manages approval queue for sensitive system gateway operations via Valkey.
 Provides queue, poll, approve, and reject functionality with TTL-based expiration.
 """
 
+import asyncio
 import json
 import logging
 import uuid
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from clients.valkey_client import get_valkey_client
 from utils.timezone_utils import utc_now
 
 logger = logging.getLogger(__name__)
 
+# Extra wait past a request's expiry before checking whether its key is gone
+_EXPIRY_GRACE_SECONDS = 1.0
+
 
 class ApprovalStatus(str, Enum):
     """Status of an approval request."""
@@ -27,7 +31,15 @@ class ApprovalStatus(str, Enum):
     EXPIRED = "expired"
 
 
-@dataclass
+class TransitionResult(str, Enum):
+    """Outcome of moving an approval request out of the pending state."""
+    OK = "ok"
+    NOT_FOUND = "not_found"
+    FORBIDDEN = "forbidden"
+    ALREADY_PROCESSED = "already_processed"
+
+
+@dataclass(slots=True)
 class ApprovalRequest:
     """Represents a pending approval request."""
     id: str
@@ -77,6 +89,8 @@ class HITLApprovalService:
     # Key prefixes for Valkey storage
     KEY_PREFIX = "hitl:approval:"
     USER_INDEX_PREFIX = "hitl:user:"
+    # Pub/sub channel prefix; decisions are published as the new status value
+    EVENTS_PREFIX = "hitl:events:"
     
     def __init__(self, default_ttl_seconds: int = 120):
         """
@@ -120,17 +134,18 @@ class HITLApprovalService:
             sensitivity=sensitivity,
             status=ApprovalStatus.PENDING,
             created_at=now,
-            expires_at=now.replace(microsecond=0) + __import__("datetime").timedelta(seconds=ttl),
+            expires_at=now + timedelta(seconds=ttl),
         )
         
-        # Store in Valkey with TTL
+        # Store with TTL and add to the user's pending index in one
+        # MULTI/EXEC round trip
         key = f"{self.KEY_PREFIX}{request.id}"
-        self._valkey.setex(key, ttl, json.dumps(request.to_dict()))
-
-        # Add to user's pending list
         user_key = f"{self.USER_INDEX_PREFIX}{user_id}"
-        self._valkey.sadd(user_key, request.id)
-        self._valkey.expire(user_key, ttl + 60)  # Slightly longer TTL for index
+        with self._valkey.pipeline(transaction=True) as pipe:
+            pipe.setex(key, ttl, json.dumps(request.to_dict()))
+            pipe.sadd(user_key, request.id)
+            pipe.expire(user_key, ttl + 60)  # Slightly longer TTL for index
+            pipe.execute()
 
         logger.info(f"Queued approval request {request.id} for user {user_id}: {operation}")
         return request
@@ -164,17 +179,21 @@ class HITLApprovalService:
             List of pending ApprovalRequests
         """
         user_key = f"{self.USER_INDEX_PREFIX}{user_id}"
-        approval_ids = self._valkey.smembers(user_key)
+        approval_ids = list(self._valkey.smembers(user_key))
+
+        # Fetch every indexed request in one round trip
+        payloads = self._valkey.mget([f"{self.KEY_PREFIX}{approval_id}" for approval_id in approval_ids])
 
         requests = []
         expired_ids = []
 
-        for approval_id in approval_ids:
-            request = await self.get_status(approval_id)
-            if request and request.status == ApprovalStatus.PENDING:
-                requests.append(request)
-            elif not request:
+        for approval_id, data in zip(approval_ids, payloads):
+            if not data:
                 expired_ids.append(approval_id)
+                continue
+            request = ApprovalRequest.from_dict(json.loads(data))
+            if request.status == ApprovalStatus.PENDING:
+                requests.append(request)
 
         # Clean up expired IDs from user index
         if expired_ids:
@@ -182,6 +201,32 @@ class HITLApprovalService:
 
         return requests
 
+    async def transition(
+        self,
+        approval_id: str,
+        user_id: str,
+        status: ApprovalStatus,
+        reason: Optional[str] = None
+    ) -> Tuple[TransitionResult, Optional[ApprovalRequest]]:
+        """
+        Approve or reject a pending request owned by user_id.
+
+        Reads the request once and writes the decision with a compare-and-set,
+        so the write only lands if the stored request is unchanged since the
+        read. A concurrent change is re-evaluated against the new state.
+
+        Args:
+            approval_id: The approval request ID
+            user_id: User deciding; must own the request
+            status: ApprovalStatus.APPROVED or ApprovalStatus.REJECTED
+            reason: Optional rejection reason
+
+        Returns:
+            Tuple of (result, request). request is None only for NOT_FOUND;
+            for OK it carries the decided state.
+        """
+        return await self._decide(approval_id, status, user_id, reason, owner_id=user_id)
+
     async def approve(self, approval_id: str, approved_by: Optional[str] = None) -> bool:
         """
         Approve a pending request.
@@ -193,20 +238,8 @@ class HITLApprovalService:
         Returns:
             True if approved, False if not found or already processed
         """
-        request = await self.get_status(approval_id)
-        if not request or request.status != ApprovalStatus.PENDING:
-            return False
-
-        request.status = ApprovalStatus.APPROVED
-        request.details["approved_by"] = approved_by
-        request.details["approved_at"] = utc_now().isoformat()
-
-        # Update in Valkey (keep short TTL for result retrieval)
-        key = f"{self.KEY_PREFIX}{approval_id}"
-        self._valkey.setex(key, 60, json.dumps(request.to_dict()))
-
-        logger.info(f"Approved request {approval_id}")
-        return True
+        result, _ = await self._decide(approval_id, ApprovalStatus.APPROVED, approved_by)
+        return result is TransitionResult.OK
 
     async def reject(
         self,
@@ -225,60 +258,99 @@ class HITLApprovalService:
         Returns:
             True if rejected, False if not found or already processed
         """
-        request = await self.get_status(approval_id)
-        if not request or request.status != ApprovalStatus.PENDING:
-            return False
+        result, _ = await self._decide(approval_id, ApprovalStatus.REJECTED, rejected_by, reason)
+        return result is TransitionResult.OK
 
-        request.status = ApprovalStatus.REJECTED
-        request.details["rejected_by"] = rejected_by
-        request.details["rejected_at"] = utc_now().isoformat()
-        if reason:
-            request.details["rejection_reason"] = reason
-
-        # Update in Valkey (keep short TTL for result retrieval)
+    async def _decide(
+        self,
+        approval_id: str,
+        status: ApprovalStatus,
+        decided_by: Optional[str],
+        reason: Optional[str] = None,
+        owner_id: Optional[str] = None
+    ) -> Tuple[TransitionResult, Optional[ApprovalRequest]]:
+        """Record a decision on a pending request, checking ownership when owner_id is given."""
         key = f"{self.KEY_PREFIX}{approval_id}"
-        self._valkey.setex(key, 60, json.dumps(request.to_dict()))
 
-        logger.info(f"Rejected request {approval_id}: {reason}")
-        return True
+        while True:
+            data = self._valkey.get(key)
+            if not data:
+                return TransitionResult.NOT_FOUND, None
+
+            request = ApprovalRequest.from_dict(json.loads(data))
+            if owner_id is not None and request.user_id != owner_id:
+                return TransitionResult.FORBIDDEN, request
+            if request.status != ApprovalStatus.PENDING:
+                return TransitionResult.ALREADY_PROCESSED, request
+
+            request.status = status
+            if status == ApprovalStatus.APPROVED:
+                request.details["approved_by"] = decided_by
+                request.details["approved_at"] = utc_now().isoformat()
+            else:
+                request.details["rejected_by"] = decided_by
+                request.details["rejected_at"] = utc_now().isoformat()
+                if reason:
+                    request.details["rejection_reason"] = reason
+
+            # Keep short TTL for result retrieval
+            if self._valkey.compare_and_setex(key, data, 60, json.dumps(request.to_dict())):
+                self._valkey.publish(f"{self.EVENTS_PREFIX}{approval_id}", status.value)
+                if status == ApprovalStatus.APPROVED:
+                    logger.info(f"Approved request {approval_id}")
+                else:
+                    logger.info(f"Rejected request {approval_id}: {reason}")
+                return TransitionResult.OK, request
 
     async def wait_for_decision(
         self,
         approval_id: str,
-        poll_interval: float = 0.5,
         max_wait: Optional[float] = None
     ) -> Optional[ApprovalRequest]:
         """
-        Wait for an approval decision with polling.
+        Wait for an approval decision.
+
+        Subscribes to the request's event channel, which approve/reject
+        publish to, so a decision is seen as soon as it is made.
 
         Args:
             approval_id: The approval request ID
-            poll_interval: Seconds between polls
             max_wait: Maximum seconds to wait (None = wait until expiry)
 
         Returns:
             Final ApprovalRequest state, or None if expired
         """
-        import asyncio
-
-        start = utc_now()
-
-        while True:
-            request = await self.get_status(approval_id)
-
-            if not request:
-                return None  # Expired
-
-            if request.status != ApprovalStatus.PENDING:
-                return request  # Decision made
-
-            # Check timeout
-            if max_wait:
-                elapsed = (utc_now() - start).total_seconds()
-                if elapsed >= max_wait:
-                    return request  # Still pending, but we timed out
-
-            await asyncio.sleep(poll_interval)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_wait if max_wait else None
+
+        pubsub = self._valkey.async_pubsub()
+        try:
+            await pubsub.subscribe(f"{self.EVENTS_PREFIX}{approval_id}")
+
+            while True:
+                # Read after subscribing, so a decision made before the
+                # subscription is still seen
+                request = await self.get_status(approval_id)
+
+                if not request:
+                    return None  # Expired
+
+                if request.status != ApprovalStatus.PENDING:
+                    return request  # Decision made
+
+                # Sleep until a decision is published, the request expires,
+                # or max_wait runs out
+                timeout = max((request.expires_at - utc_now()).total_seconds(), 0.0)
+                timeout += _EXPIRY_GRACE_SECONDS
+                if deadline is not None:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        return request  # Still pending, but we timed out
+                    timeout = min(timeout, remaining)
+
+                await pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        finally:
+            await pubsub.aclose()
 
 
 # Singleton instance
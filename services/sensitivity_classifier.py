@@ -8,12 +8,24 @@ Classifies commands and file operations by sensitivity level:
 - BLOCKED: Operations that are never allowed
 """
 
+import logging
 import re
 from enum import Enum
-from typing import List, Optional
+from typing import Any, List, Optional
 
 from config.config_manager import config
 
+logger = logging.getLogger(__name__)
+
+# Prefer RE2 when installed: it matches in linear time, so adversarial
+# commands cannot drive the classifier into catastrophic backtracking
+try:
+    import re2
+    HAS_RE2 = True
+except ImportError:
+    HAS_RE2 = False
+    logger.debug("google-re2 not installed - using stdlib re for sensitivity patterns")
+
 
 class SensitivityLevel(str, Enum):
     """Sensitivity levels for gateway operations."""
@@ -121,6 +133,26 @@ HIGH_SENSITIVITY_FILE_PATTERNS = [
 ]
 
 
+def _compile_union(patterns: List[str]) -> Any:
+    """Combine patterns into one case-insensitive alternation (RE2 or re)."""
+    union = "|".join(f"(?:{pattern})" for pattern in patterns)
+    if HAS_RE2:
+        try:
+            return re2.compile(f"(?i){union}")
+        except re2.error as e:
+            logger.warning(f"RE2 rejected sensitivity patterns, using stdlib re: {e}")
+    return re.compile(union, re.IGNORECASE)
+
+
+# Each pattern list compiled once, so a classification is one search per level
+_BLOCKED_COMMAND_RE = _compile_union(BLOCKED_COMMAND_PATTERNS)
+_HIGH_SENSITIVITY_RE = _compile_union(HIGH_SENSITIVITY_PATTERNS)
+_PROMPT_RE = _compile_union(PROMPT_PATTERNS)
+_AUTO_RE = _compile_union(AUTO_PATTERNS)
+_BLOCKED_FILE_RE = _compile_union(BLOCKED_FILE_PATTERNS)
+_HIGH_SENSITIVITY_FILE_RE = _compile_union(HIGH_SENSITIVITY_FILE_PATTERNS)
+
+
 def classify_command(command: str) -> SensitivityLevel:
     """
     Classify a shell command by sensitivity level.
@@ -131,27 +163,21 @@ def classify_command(command: str) -> SensitivityLevel:
     Returns:
         SensitivityLevel for the command
     """
-    command_lower = command.lower()
-    
     # Check blocked patterns first
-    for pattern in BLOCKED_COMMAND_PATTERNS:
-        if re.search(pattern, command_lower, re.IGNORECASE):
-            return SensitivityLevel.BLOCKED
+    if _BLOCKED_COMMAND_RE.search(command):
+        return SensitivityLevel.BLOCKED
     
     # Check high sensitivity
-    for pattern in HIGH_SENSITIVITY_PATTERNS:
-        if re.search(pattern, command_lower, re.IGNORECASE):
-            return SensitivityLevel.HIGH
+    if _HIGH_SENSITIVITY_RE.search(command):
+        return SensitivityLevel.HIGH
     
     # Check prompt patterns
-    for pattern in PROMPT_PATTERNS:
-        if re.search(pattern, command_lower, re.IGNORECASE):
-            return SensitivityLevel.PROMPT
+    if _PROMPT_RE.search(command):
+        return SensitivityLevel.PROMPT
     
     # Check auto-approve patterns
-    for pattern in AUTO_PATTERNS:
-        if re.search(pattern, command_lower, re.IGNORECASE):
-            return SensitivityLevel.AUTO
+    if _AUTO_RE.search(command):
+        return SensitivityLevel.AUTO
     
     # Default to PROMPT for unknown commands
     return SensitivityLevel.PROMPT
@@ -169,22 +195,19 @@ def classify_file_operation(operation: str, path: str) -> SensitivityLevel:
         SensitivityLevel for the operation
     """
     # Check blocked patterns
-    for pattern in BLOCKED_FILE_PATTERNS:
-        if re.search(pattern, path, re.IGNORECASE):
-            return SensitivityLevel.BLOCKED
+    if _BLOCKED_FILE_RE.search(path):
+        return SensitivityLevel.BLOCKED
     
     # Read operations on high-sensitivity files just need prompt
     if operation in ("read_file", "read_structure"):
-        for pattern in HIGH_SENSITIVITY_FILE_PATTERNS:
-            if re.search(pattern, path, re.IGNORECASE):
-                return SensitivityLevel.PROMPT
+        if _HIGH_SENSITIVITY_FILE_RE.search(path):
+            return SensitivityLevel.PROMPT
         return SensitivityLevel.AUTO
     
     # Edit operations on high-sensitivity files are HIGH
     if operation == "edit_file":
-        for pattern in HIGH_SENSITIVITY_FILE_PATTERNS:
-            if re.search(pattern, path, re.IGNORECASE):
-                return SensitivityLevel.HIGH
+        if _HIGH_SENSITIVITY_FILE_RE.search(path):
+            return SensitivityLevel.HIGH
         return SensitivityLevel.PROMPT
     
     return SensitivityLevel.PROMPT
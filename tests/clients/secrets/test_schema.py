@@ -111,6 +111,24 @@ class TestSchemaValidation:
         validate(schema, secrets)
 
 
+    def test_validate_reports_missing_section_once(self):
+        """Missing nested section is reported once, not once per child."""
+        schema = {
+            "database": {
+                "pool": {
+                    "url": {"type": "string", "required": True},
+                    "size": {"type": "integer", "required": True},
+                },
+            }
+        }
+        secrets = {"database": {}}
+
+        with pytest.raises(SchemaError, match="1 error") as exc_info:
+            validate(schema, secrets)
+
+        assert "MISSING SECTION: database.pool" in str(exc_info.value)
+
+
 class TestGetRequiredFields:
     """Test required field extraction."""
 
@@ -0,0 +1,58 @@
+"""
+Tests for clients/secrets/sops_backend.py - SOPS backend lookups.
+
+Tests secret lookup semantics on an already-decrypted tree, without
+requiring the sops binary or an age key.
+"""
+import pytest
+
+from clients.secrets.sops_backend import SOPSBackend
+
+
+@pytest.fixture
+def backend():
+    """Backend populated with a decrypted tree, bypassing sops."""
+    backend = SOPSBackend()
+    backend._secrets = {
+        "providers": {"anthropic_key": "sk-ant-123456"},
+        "database": {
+            "username": "mira",
+            "pool": {"size": 5},
+        },
+    }
+    backend._flatten_secrets()
+    backend._initialized = True
+    return backend
+
+
+class TestGet:
+    """Test SOPSBackend.get lookup semantics."""
+
+    def test_returns_nested_string_secret(self, backend):
+        """Dotted path resolves to the nested string leaf."""
+        assert backend.get("providers.anthropic_key") == "sk-ant-123456"
+
+    def test_raises_key_error_on_missing_secret(self, backend):
+        """Missing path raises KeyError, never a default."""
+        with pytest.raises(KeyError, match="REQUIRED SECRET NOT FOUND"):
+            backend.get("providers.openai_key")
+
+    def test_raises_key_error_below_string_leaf(self, backend):
+        """Path continuing past a string leaf is not found."""
+        with pytest.raises(KeyError):
+            backend.get("providers.anthropic_key.extra")
+
+    def test_raises_value_error_on_non_string_leaf(self, backend):
+        """Non-string leaf raises ValueError with the actual type."""
+        with pytest.raises(ValueError, match="got int"):
+            backend.get("database.pool.size")
+
+    def test_raises_value_error_on_section(self, backend):
+        """Section path raises ValueError rather than returning a dict."""
+        with pytest.raises(ValueError, match="got dict"):
+            backend.get("database")
+
+    def test_raises_when_not_initialized(self):
+        """Lookup before init() fails fast."""
+        with pytest.raises(RuntimeError, match="not initialized"):
+            SOPSBackend().get("providers.anthropic_key")
@@ -9,6 +9,43 @@ import pytest
 from tests.fixtures.reset import full_reset
 from tests.fixtures.isolation import *
 from tests.fixtures.core import *
+from tests.fixtures.gateway import GATEWAY_SKIP_REASON, gateway_available, gateway_client
+
+
+def pytest_configure(config):
+    """Register custom markers."""
+    config.addinivalue_line(
+        "markers", "requires_gateway: needs a running System Gateway container"
+    )
+    # Registered by pytest-xdist when installed; declared here so runs
+    # without it do not warn about an unknown mark
+    config.addinivalue_line(
+        "markers", "xdist_group(name): run tests of this group on one xdist worker"
+    )
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """Probe the gateway once in the xdist controller and hand the result to each worker."""
+    node.workerinput["gateway_up"] = gateway_available()
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip gateway tests when the container is down, probing it only once."""
+    gateway_items = [item for item in items if item.get_closest_marker("requires_gateway")]
+    if not gateway_items:
+        return
+
+    # xdist workers reuse the controller's probe instead of making their own
+    workerinput = getattr(config, "workerinput", {})
+    gateway_up = workerinput.get("gateway_up")
+    if gateway_up is None:
+        gateway_up = gateway_available()
+
+    if not gateway_up:
+        skip = pytest.mark.skip(reason=GATEWAY_SKIP_REASON)
+        for item in gateway_items:
+            item.add_marker(skip)
 
 
 @pytest.fixture(autouse=True, scope="function")
@@ -0,0 +1,49 @@
+"""
+System Gateway container fixtures.
+
+Modules that talk to a running gateway set
+``pytestmark = pytest.mark.requires_gateway``; conftest probes the
+container once per session and skips those tests when it is down.
+
+The suites are mostly independent HTTP round trips and can run in
+parallel with ``pytest -n auto --dist=loadgroup tests/security
+tests/integration``. Stateful classes share the "gateway_stateful"
+xdist group, so they stay on a single worker.
+"""
+import functools
+import os
+
+import pytest
+
+GATEWAY_URL = os.environ.get("GATEWAY_TEST_URL", "http://localhost:8765")
+GATEWAY_SKIP_REASON = "Gateway container not available. Start with: docker-compose up system-gateway"
+
+
+@functools.lru_cache(maxsize=None)
+def gateway_available() -> bool:
+    """Check if gateway container is available (probed once per session)."""
+    import httpx
+
+    try:
+        response = httpx.get(f"{GATEWAY_URL}/health", timeout=2.0)
+        return response.status_code == 200
+    except Exception:
+        return False
+
+
+@pytest.fixture(scope="session")
+def gateway_client():
+    """
+    HTTP client for gateway, shared by every gateway test in the session.
+
+    Gateway endpoints are stateless, so one pooled client saves a
+    connection setup and teardown per test.
+    """
+    import httpx
+
+    with httpx.Client(
+        base_url=GATEWAY_URL,
+        timeout=30.0,
+        limits=httpx.Limits(max_keepalive_connections=8, max_connections=16),
+    ) as c:
+        yield c
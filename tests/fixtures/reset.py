@@ -72,13 +72,12 @@ def reset_singletons():
 
 
     try:
-        # Reset secrets backend singleton and cache
+        # Reset secrets backend singleton and memoized lookups
         import clients.secrets
         import clients.secrets.compat
         if hasattr(clients.secrets, '_secrets_backend'):
             clients.secrets._secrets_backend = None
-        if hasattr(clients.secrets.compat, '_secret_cache'):
-            clients.secrets.compat._secret_cache.clear()
+        clients.secrets.compat.clear_secret_cache()
         logger.debug("Secrets backend singleton and cache reset")
     except Exception as e:
         logger.warning(f"Error resetting secrets backend: {e}")
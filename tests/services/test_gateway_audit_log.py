@@ -0,0 +1,82 @@
+"""
+Unit tests for GatewayAuditLogger.
+
+Tests that entries queued through the log helpers are all written as
+JSON lines by the background writer once the logger is closed.
+"""
+
+import json
+
+import pytest
+
+from services.gateway_audit_log import GatewayAuditLogger, OperationType
+
+
+@pytest.fixture
+def audit_logger(tmp_path):
+    """Audit logger writing to a temporary directory."""
+    logger = GatewayAuditLogger(log_dir=tmp_path)
+    yield logger
+    logger.close()
+
+
+def read_entries(logger):
+    """Parse every line of the logger's file as JSON."""
+    lines = logger.log_file.read_bytes().splitlines()
+    return [json.loads(line) for line in lines]
+
+
+class TestGatewayAuditLogger:
+    """Tests for batched audit log writes."""
+
+    def test_close_writes_every_entry(self, audit_logger):
+        """Every entry logged before close() ends up as one JSON line."""
+        count = 2500  # More than one writev batch
+        for i in range(count):
+            audit_logger.log_execute("user-1", f"echo {i}", success=True, exit_code=0, duration_ms=i)
+
+        audit_logger.close()
+
+        entries = read_entries(audit_logger)
+        assert len(entries) == count
+        assert [entry["target"] for entry in entries] == [f"echo {i}" for i in range(count)]
+        assert audit_logger.stats()["entries_written"] == count
+
+    def test_entry_fields(self, audit_logger):
+        """Entries serialize every AuditEntry field with enum values and a UTC timestamp."""
+        audit_logger.log(
+            "user-1", OperationType.APPROVAL_GRANTED, "git push", "success",
+            details={"approver": "admin"}, sensitivity="high", approval_id="abc"
+        )
+
+        audit_logger.close()
+
+        [entry] = read_entries(audit_logger)
+        assert entry["operation"] == "approval_granted"
+        assert entry["user_id"] == "user-1"
+        assert entry["result"] == "success"
+        assert entry["details"] == {"approver": "admin"}
+        assert entry["sensitivity"] == "high"
+        assert entry["approval_id"] == "abc"
+        assert entry["timestamp"].endswith("+0000")
+
+    def test_blocked_resolves_operation_name(self, audit_logger):
+        """log_blocked maps known operation names and falls back to execute."""
+        audit_logger.log_blocked("user-1", "read_file", "secret.key", "blocked pattern")
+        audit_logger.log_blocked("user-1", "unknown", "rm -rf /", "blocked command")
+
+        audit_logger.close()
+
+        entries = read_entries(audit_logger)
+        assert [entry["operation"] for entry in entries] == ["read_file", "execute"]
+        assert all(entry["result"] == "blocked" for entry in entries)
+
+    def test_close_is_idempotent(self, audit_logger):
+        """A second close() is a no-op rather than closing the descriptor twice."""
+        audit_logger.log_read_structure("user-1", "", success=True)
+
+        audit_logger.close()
+        audit_logger.close()
+
+        [entry] = read_entries(audit_logger)
+        assert entry["target"] == "/"
@@ -1,43 +1,148 @@
 """
 Unit tests for HITLApprovalService.
 
-Tests queue_approval, get_status, approve, reject, and TTL expiration
-with mocked Valkey client.
+Tests queue_approval, get_status, approve, reject, wait_for_decision, and
+TTL expiration against an in-memory fake of the Valkey client.
 """
 
+import asyncio
+import time
+
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import patch
 from uuid import uuid4
 import json
 
 from services.hitl_approval_service import (
     HITLApprovalService,
-    ApprovalRequest,
     ApprovalStatus,
-    ApprovalDecision,
+    TransitionResult,
 )
 from services.sensitivity_classifier import SensitivityLevel
 
 
+class _FakePipeline:
+    """Pipeline that queues commands and applies them on execute()."""
+
+    def __init__(self, valkey):
+        self._valkey = valkey
+        self._commands = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._commands.clear()
+
+    def __getattr__(self, name):
+        method = getattr(self._valkey, name)
+        return lambda *args: self._commands.append((method, args))
+
+    def execute(self):
+        results = [method(*args) for method, args in self._commands]
+        self._commands.clear()
+        return results
+
+
+class _FakePubSub:
+    """Async pub/sub connection that receives what FakeValkey.publish sends."""
+
+    def __init__(self, valkey):
+        self._valkey = valkey
+        self._messages = asyncio.Queue()
+        self.channels = set()
+        self.closed = False
+
+    async def subscribe(self, channel):
+        self.channels.add(channel)
+        self._valkey.subscribers.append(self)
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=None):
+        try:
+            return await asyncio.wait_for(self._messages.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def aclose(self):
+        self.closed = True
+        self._valkey.subscribers.remove(self)
+
+
+class FakeValkey:
+    """Dict-backed stand-in for the ValkeyClient calls the service makes."""
+
+    def __init__(self):
+        self.store = {}
+        self.ttls = {}
+        self.deadlines = {}
+        self.sets = {}
+        self.published = []
+        self.subscribers = []
+        self.pubsubs = []
+
+    def setex(self, key, seconds, value):
+        self.store[key] = value
+        self.ttls[key] = seconds
+        self.deadlines[key] = time.monotonic() + seconds
+
+    def get(self, key):
+        if key in self.deadlines and time.monotonic() >= self.deadlines[key]:
+            self.delete(key)
+        return self.store.get(key)
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def delete(self, key):
+        self.store.pop(key, None)
+        self.deadlines.pop(key, None)
+
+    def compare_and_setex(self, key, expected, seconds, value):
+        if self.get(key) != expected:
+            return False
+        self.setex(key, seconds, value)
+        return True
+
+    def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(members)
+
+    def srem(self, key, *members):
+        self.sets.get(key, set()).difference_update(members)
+
+    def smembers(self, key):
+        return set(self.sets.get(key, ()))
+
+    def expire(self, key, seconds):
+        self.ttls[key] = seconds
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+        receivers = [sub for sub in self.subscribers if channel in sub.channels]
+        for sub in receivers:
+            sub._messages.put_nowait({"type": "message", "channel": channel, "data": message})
+        return len(receivers)
+
+    def async_pubsub(self):
+        pubsub = _FakePubSub(self)
+        self.pubsubs.append(pubsub)
+        return pubsub
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+
 @pytest.fixture
-def mock_valkey():
-    """Create mock Valkey client."""
-    mock = MagicMock()
-    mock.setex = MagicMock()
-    mock.get = MagicMock()
-    mock.delete = MagicMock()
-    mock.keys = MagicMock(return_value=[])
-    return mock
+def fake_valkey():
+    """Create in-memory Valkey fake."""
+    return FakeValkey()
 
 
 @pytest.fixture
-def service(mock_valkey):
-    """Create HITLApprovalService with mocked Valkey."""
+def service(fake_valkey):
+    """Create HITLApprovalService backed by the fake."""
     with patch("services.hitl_approval_service.get_valkey_client") as mock_get:
-        mock_get.return_value = mock_valkey
-        svc = HITLApprovalService()
-        svc._valkey = mock_valkey
-        yield svc
+        mock_get.return_value = fake_valkey
+        yield HITLApprovalService()
 
 
 @pytest.fixture
@@ -46,142 +151,263 @@ def user_id():
     return str(uuid4())
 
 
+async def _queue(service, user_id, **kwargs):
+    """Queue a typical command approval."""
+    return await service.queue_approval(
+        user_id=user_id,
+        operation="execute: npm install",
+        details={"description": "Install dependencies"},
+        sensitivity=SensitivityLevel.PROMPT.value,
+        **kwargs
+    )
+
+
 class TestQueueApproval:
     """Tests for queue_approval method."""
-    
-    def test_queue_approval_creates_request(self, service, user_id, mock_valkey):
-        """queue_approval creates and stores approval request."""
-        approval_id = service.queue_approval(
+
+    @pytest.mark.asyncio
+    async def test_queue_approval_creates_request(self, service, user_id, fake_valkey):
+        """queue_approval creates, stores and indexes the approval request."""
+        request = await service.queue_approval(
             user_id=user_id,
-            operation="execute",
-            target="rm -rf /tmp/test",
-            description="Delete test directory",
-            sensitivity=SensitivityLevel.HIGH
+            operation="execute: rm -rf /tmp/test",
+            details={"description": "Delete test directory"},
+            sensitivity=SensitivityLevel.HIGH.value
         )
-        
-        assert approval_id is not None
-        mock_valkey.setex.assert_called_once()
-        
-        # Verify stored data
-        call_args = mock_valkey.setex.call_args
-        key = call_args[0][0]
-        ttl = call_args[0][1]
-        data = json.loads(call_args[0][2])
-        
-        assert f"hitl:approval:{approval_id}" == key
-        assert ttl == 300  # Default TTL
+
+        key = f"hitl:approval:{request.id}"
+        data = json.loads(fake_valkey.store[key])
+
+        assert fake_valkey.ttls[key] == 120  # Default TTL
         assert data["user_id"] == user_id
-        assert data["operation"] == "execute"
+        assert data["operation"] == "execute: rm -rf /tmp/test"
         assert data["status"] == "pending"
-    
-    def test_queue_approval_with_custom_ttl(self, service, user_id, mock_valkey):
+        assert request.id in fake_valkey.smembers(f"hitl:user:{user_id}")
+
+    @pytest.mark.asyncio
+    async def test_queue_approval_with_custom_ttl(self, service, user_id, fake_valkey):
         """queue_approval respects custom TTL."""
-        approval_id = service.queue_approval(
-            user_id=user_id,
-            operation="edit_file",
-            target="/etc/config",
-            description="Edit config",
-            sensitivity=SensitivityLevel.PROMPT,
-            ttl_seconds=600
-        )
-        
-        call_args = mock_valkey.setex.call_args
-        ttl = call_args[0][1]
-        assert ttl == 600
+        request = await _queue(service, user_id, ttl_seconds=600)
+
+        assert fake_valkey.ttls[f"hitl:approval:{request.id}"] == 600
 
 
 class TestGetStatus:
     """Tests for get_status method."""
-    
-    def test_get_status_returns_pending(self, service, user_id, mock_valkey):
+
+    @pytest.mark.asyncio
+    async def test_get_status_returns_pending(self, service, user_id):
         """get_status returns pending status for queued request."""
-        approval_id = str(uuid4())
-        mock_valkey.get.return_value = json.dumps({
-            "approval_id": approval_id,
-            "user_id": user_id,
-            "operation": "execute",
-            "target": "ls",
-            "description": "List files",
-            "sensitivity": "prompt",
-            "status": "pending",
-            "created_at": "2024-01-01T00:00:00Z"
-        })
-        
-        status = service.get_status(approval_id)
-        
+        request = await _queue(service, user_id)
+
+        status = await service.get_status(request.id)
+
         assert status is not None
         assert status.status == ApprovalStatus.PENDING
-    
-    def test_get_status_returns_none_for_missing(self, service, mock_valkey):
+        assert status.user_id == user_id
+
+    @pytest.mark.asyncio
+    async def test_get_status_returns_none_for_missing(self, service):
         """get_status returns None for non-existent request."""
-        mock_valkey.get.return_value = None
-        
-        status = service.get_status(str(uuid4()))
-        
+        status = await service.get_status(str(uuid4()))
+
         assert status is None
 
 
 class TestApprove:
     """Tests for approve method."""
-    
-    def test_approve_updates_status(self, service, user_id, mock_valkey):
-        """approve updates request status to approved."""
-        approval_id = str(uuid4())
-        mock_valkey.get.return_value = json.dumps({
-            "approval_id": approval_id,
-            "user_id": user_id,
-            "operation": "execute",
-            "target": "npm install",
-            "description": "Install dependencies",
-            "sensitivity": "prompt",
-            "status": "pending",
-            "created_at": "2024-01-01T00:00:00Z"
-        })
-        
-        result = service.approve(approval_id)
-        
+
+    @pytest.mark.asyncio
+    async def test_approve_updates_status(self, service, user_id, fake_valkey):
+        """approve updates request status to approved and publishes it."""
+        request = await _queue(service, user_id)
+
+        result = await service.approve(request.id, approved_by=user_id)
+
         assert result is True
-        mock_valkey.setex.assert_called()
-        
-        # Verify updated status
-        call_args = mock_valkey.setex.call_args
-        data = json.loads(call_args[0][2])
+        data = json.loads(fake_valkey.store[f"hitl:approval:{request.id}"])
         assert data["status"] == "approved"
-    
-    def test_approve_returns_false_for_missing(self, service, mock_valkey):
+        assert data["details"]["approved_by"] == user_id
+        assert fake_valkey.published == [(f"hitl:events:{request.id}", "approved")]
+
+    @pytest.mark.asyncio
+    async def test_approve_returns_false_for_missing(self, service):
         """approve returns False for non-existent request."""
-        mock_valkey.get.return_value = None
-        
-        result = service.approve(str(uuid4()))
-        
+        result = await service.approve(str(uuid4()))
+
         assert result is False
 
 
 class TestReject:
     """Tests for reject method."""
-    
-    def test_reject_updates_status(self, service, user_id, mock_valkey):
+
+    @pytest.mark.asyncio
+    async def test_reject_updates_status(self, service, user_id, fake_valkey):
         """reject updates request status to rejected."""
-        approval_id = str(uuid4())
-        mock_valkey.get.return_value = json.dumps({
-            "approval_id": approval_id,
-            "user_id": user_id,
-            "operation": "execute",
-            "target": "rm -rf /",
-            "description": "Dangerous command",
-            "sensitivity": "high",
-            "status": "pending",
-            "created_at": "2024-01-01T00:00:00Z"
-        })
-        
-        result = service.reject(approval_id, reason="Too dangerous")
-        
+        request = await _queue(service, user_id)
+
+        result = await service.reject(request.id, reason="Too dangerous")
+
         assert result is True
-        mock_valkey.setex.assert_called()
-        
-        # Verify updated status and reason
-        call_args = mock_valkey.setex.call_args
-        data = json.loads(call_args[0][2])
+        data = json.loads(fake_valkey.store[f"hitl:approval:{request.id}"])
         assert data["status"] == "rejected"
-        assert data["rejection_reason"] == "Too dangerous"
+        assert data["details"]["rejection_reason"] == "Too dangerous"
+
+    @pytest.mark.asyncio
+    async def test_reject_after_approve_returns_false(self, service, user_id):
+        """reject returns False once the request has been decided."""
+        request = await _queue(service, user_id)
+        await service.approve(request.id)
+
+        result = await service.reject(request.id, reason="Too late")
+
+        assert result is False
+
+
+class TestTransition:
+    """Tests for transition method."""
+
+    @pytest.mark.asyncio
+    async def test_transition_by_owner(self, service, user_id, fake_valkey):
+        """The owner's decision is stored and returned."""
+        request = await _queue(service, user_id)
+
+        result, decided = await service.transition(request.id, user_id, ApprovalStatus.APPROVED)
+
+        assert result is TransitionResult.OK
+        assert decided.status == ApprovalStatus.APPROVED
+        assert json.loads(fake_valkey.store[f"hitl:approval:{request.id}"])["status"] == "approved"
+
+    @pytest.mark.asyncio
+    async def test_transition_by_other_user_is_forbidden(self, service, user_id, fake_valkey):
+        """Another user cannot decide the request, and it stays pending."""
+        request = await _queue(service, user_id)
+
+        result, current = await service.transition(request.id, str(uuid4()), ApprovalStatus.APPROVED)
+
+        assert result is TransitionResult.FORBIDDEN
+        assert current.status == ApprovalStatus.PENDING
+        assert json.loads(fake_valkey.store[f"hitl:approval:{request.id}"])["status"] == "pending"
+        assert fake_valkey.published == []
+
+    @pytest.mark.asyncio
+    async def test_transition_after_decision(self, service, user_id):
+        """A decided request reports ALREADY_PROCESSED with its stored status."""
+        request = await _queue(service, user_id)
+        await service.reject(request.id)
+
+        result, current = await service.transition(request.id, user_id, ApprovalStatus.APPROVED)
+
+        assert result is TransitionResult.ALREADY_PROCESSED
+        assert current.status == ApprovalStatus.REJECTED
+
+    @pytest.mark.asyncio
+    async def test_transition_after_expiry(self, service, user_id, fake_valkey):
+        """An expired request is NOT_FOUND."""
+        request = await _queue(service, user_id)
+        fake_valkey.deadlines[f"hitl:approval:{request.id}"] = time.monotonic()
+
+        result, current = await service.transition(request.id, user_id, ApprovalStatus.APPROVED)
+
+        assert result is TransitionResult.NOT_FOUND
+        assert current is None
+
+    @pytest.mark.asyncio
+    async def test_concurrent_decision_wins(self, service, user_id, fake_valkey):
+        """When another writer decides first, the retry sees its decision."""
+        request = await _queue(service, user_id)
+        compare_and_setex = fake_valkey.compare_and_setex
+
+        def rejected_first(key, expected, seconds, value):
+            # Another writer rejects between the service's read and its write
+            stored = json.loads(fake_valkey.store[key])
+            stored["status"] = "rejected"
+            fake_valkey.setex(key, 60, json.dumps(stored))
+            return compare_and_setex(key, expected, seconds, value)
+
+        fake_valkey.compare_and_setex = rejected_first
+        result, current = await service.transition(request.id, user_id, ApprovalStatus.APPROVED)
+
+        assert result is TransitionResult.ALREADY_PROCESSED
+        assert current.status == ApprovalStatus.REJECTED
+        assert fake_valkey.published == []
+
+    @pytest.mark.asyncio
+    async def test_concurrent_change_to_pending_request_retries(self, service, user_id, fake_valkey):
+        """A lost compare-and-set on a still-pending request is retried against the new value."""
+        request = await _queue(service, user_id)
+        key = f"hitl:approval:{request.id}"
+        compare_and_setex = fake_valkey.compare_and_setex
+        attempts = []
+
+        def touched_first(key, expected, seconds, value):
+            attempts.append(expected)
+            if len(attempts) == 1:
+                stored = json.loads(fake_valkey.store[key])
+                stored["details"]["note"] = "edited"
+                fake_valkey.setex(key, 120, json.dumps(stored))
+            return compare_and_setex(key, expected, seconds, value)
+
+        fake_valkey.compare_and_setex = touched_first
+        result, decided = await service.transition(request.id, user_id, ApprovalStatus.APPROVED)
+
+        assert result is TransitionResult.OK
+        assert len(attempts) == 2
+        stored = json.loads(fake_valkey.store[key])
+        assert stored["status"] == "approved"
+        assert stored["details"]["note"] == "edited"
+        assert fake_valkey.published == [(f"hitl:events:{request.id}", "approved")]
+
+
+class TestWaitForDecision:
+    """Tests for wait_for_decision method."""
+
+    @pytest.mark.asyncio
+    async def test_decision_made_before_subscribe(self, service, user_id, fake_valkey):
+        """A decision stored before the wait starts is returned without waiting."""
+        request = await _queue(service, user_id)
+        await service.approve(request.id)
+
+        result = await asyncio.wait_for(service.wait_for_decision(request.id), timeout=1)
+
+        assert result.status == ApprovalStatus.APPROVED
+        assert [pubsub.closed for pubsub in fake_valkey.pubsubs] == [True]
+
+    @pytest.mark.asyncio
+    async def test_decision_published_while_waiting(self, service, user_id, fake_valkey):
+        """A decision published during the wait wakes the waiter."""
+        request = await _queue(service, user_id)
+
+        waiter = asyncio.create_task(service.wait_for_decision(request.id))
+        while not fake_valkey.subscribers:
+            await asyncio.sleep(0)
+        await service.reject(request.id, reason="Not now")
+
+        result = await asyncio.wait_for(waiter, timeout=1)
+
+        assert result.status == ApprovalStatus.REJECTED
+        assert result.details["rejection_reason"] == "Not now"
+        assert fake_valkey.subscribers == []
+
+    @pytest.mark.asyncio
+    async def test_expired_request_returns_none(self, service, user_id, fake_valkey):
+        """The wait ends with None once the request expires undecided."""
+        request = await _queue(service, user_id, ttl_seconds=1)
+
+        with patch("services.hitl_approval_service._EXPIRY_GRACE_SECONDS", 0.05):
+            result = await asyncio.wait_for(service.wait_for_decision(request.id), timeout=3)
+
+        assert result is None
+        assert fake_valkey.subscribers == []
+
+    @pytest.mark.asyncio
+    async def test_max_wait_returns_pending_request(self, service, user_id, fake_valkey):
+        """max_wait ends the wait with the still-pending request."""
+        request = await _queue(service, user_id)
+
+        start = time.monotonic()
+        result = await service.wait_for_decision(request.id, max_wait=0.05)
 
+        assert result.status == ApprovalStatus.PENDING
+        assert time.monotonic() - start < 1
+        assert fake_valkey.subscribers == []
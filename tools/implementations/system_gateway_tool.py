@@ -7,8 +7,10 @@ for sensitive operations.
 """
 
 import fnmatch
+import functools
 import logging
 import re
+from itertools import islice
 from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field
@@ -38,78 +40,114 @@ class SensitivityLevel:
 
 
 # Commands that auto-approve
-AUTO_APPROVE_COMMANDS = {
+AUTO_APPROVE_COMMANDS = frozenset({
     "ls", "cat", "head", "tail", "grep", "find", "wc", "pwd", "echo",
     "tree", "file", "stat", "du", "df", "which", "whoami", "date",
     "env", "printenv", "basename", "dirname", "realpath", "readlink",
-}
+})
 
 # Commands that require approval
-PROMPT_COMMANDS = {
+PROMPT_COMMANDS = frozenset({
     "mv", "cp", "touch", "mkdir", "npm", "pip", "yarn", "pnpm",
-    "python", "node", "bun", "cargo", "go", "make", "git status",
-    "git log", "git diff", "git branch",
+    "python", "node", "bun", "cargo", "go", "make",
+})
+
+# Subcommands that require approval, keyed by base command
+PROMPT_SUBCOMMANDS = {
+    "git": frozenset({"status", "log", "diff", "branch"}),
 }
 
-# High-risk commands requiring explicit confirmation
-HIGH_RISK_PATTERNS = [
-    r"^rm\s", r"^git\s+push", r"^git\s+checkout", r"^git\s+reset",
-    r"^git\s+rebase", r"^git\s+merge", r"^chmod\s", r"^chown\s",
-]
+# High-risk commands requiring explicit confirmation, keyed by base command.
+# Values are subcommand prefixes; "" matches any invocation with arguments.
+HIGH_RISK_PREFIXES = {
+    "rm": ("",),
+    "git": ("push", "checkout", "reset", "rebase", "merge"),
+    "chmod": ("",),
+    "chown": ("",),
+}
 
 # Commands that are always blocked
-BLOCKED_COMMANDS = {
+BLOCKED_COMMANDS = frozenset({
     "sudo", "su", "mount", "umount", "reboot", "shutdown", "halt",
     "init", "systemctl", "service", "passwd", "useradd", "userdel",
+})
+
+# Base command -> level in one lookup; blocked wins over auto, auto over prompt
+_COMMAND_LEVELS = {
+    **dict.fromkeys(PROMPT_COMMANDS, SensitivityLevel.PROMPT),
+    **dict.fromkeys(AUTO_APPROVE_COMMANDS, SensitivityLevel.AUTO),
+    **dict.fromkeys(BLOCKED_COMMANDS, SensitivityLevel.BLOCKED),
 }
 
-# Dangerous patterns
-BLOCKED_PATTERNS = [
-    r"\|\s*sh\b", r"\|\s*bash\b", r"\|\s*zsh\b",  # Pipe to shell
-    r"`", r"\$\(",  # Command substitution
-    r">\s*/dev/", r">>\s*/dev/",  # Writing to devices
-    r"/etc/", r"/var/", r"/usr/",  # System directories
-    r"~/.ssh", r"~/.gnupg",  # Sensitive user directories
-]
+# Dangerous literal substrings
+BLOCKED_SUBSTRINGS = (
+    "`", "$(",  # Command substitution
+    "/etc/", "/var/", "/usr/",  # System directories
+    "~/.ssh", "~/.gnupg",  # Sensitive user directories
+)
+
+# Dangerous patterns that genuinely need a regex: pipe to shell, writing to devices
+_BLOCKED_RE = re.compile(r"\|\s*(?:sh|bash|zsh)\b|>>?\s*/dev/")
+# Every _BLOCKED_RE match starts at one of these, so most commands skip the regex
+_BLOCKED_RE_TRIGGERS = ("|", ">")
 
 
+@functools.lru_cache(maxsize=1024)
 def classify_command(command: str) -> str:
     """Classify command sensitivity level."""
     command_lower = command.lower().strip()
     
     # Check blocked patterns first
-    for pattern in BLOCKED_PATTERNS:
-        if re.search(pattern, command_lower):
-            return SensitivityLevel.BLOCKED
+    if any(s in command_lower for s in BLOCKED_SUBSTRINGS):
+        return SensitivityLevel.BLOCKED
+    if (
+        any(c in command_lower for c in _BLOCKED_RE_TRIGGERS)
+        and _BLOCKED_RE.search(command_lower)
+    ):
+        return SensitivityLevel.BLOCKED
     
     # Get base command
-    parts = command_lower.split()
+    # Split on any whitespace so tabs can't smuggle a command past the lookups
+    parts = command_lower.split(None, 1)
     if not parts:
         return SensitivityLevel.BLOCKED
     
-    base_cmd = parts[0].split("/")[-1]  # Handle full paths
+    base_cmd = parts[0].rpartition("/")[2]  # Handle full paths
+    args = parts[1] if len(parts) > 1 else ""
     
     # Check blocked commands
-    if base_cmd in BLOCKED_COMMANDS:
-        return SensitivityLevel.BLOCKED
+    level = _COMMAND_LEVELS.get(base_cmd)
+    if level == SensitivityLevel.BLOCKED:
+        return level
     
-    # Check high-risk patterns
-    for pattern in HIGH_RISK_PATTERNS:
-        if re.match(pattern, command_lower):
-            return SensitivityLevel.HIGH
+    # Check high-risk commands
+    risky_prefixes = HIGH_RISK_PREFIXES.get(base_cmd)
+    if risky_prefixes and args and args.startswith(risky_prefixes):
+        return SensitivityLevel.HIGH
     
-    # Check auto-approve
-    if base_cmd in AUTO_APPROVE_COMMANDS:
-        return SensitivityLevel.AUTO
+    # Check auto-approve and prompt commands
+    if level is not None:
+        return level
     
-    # Check prompt commands
-    if base_cmd in PROMPT_COMMANDS:
+    prompt_subcommands = PROMPT_SUBCOMMANDS.get(base_cmd)
+    if prompt_subcommands and args and args.split(None, 1)[0] in prompt_subcommands:
         return SensitivityLevel.PROMPT
     
     # Default to prompt for unknown commands
     return SensitivityLevel.PROMPT
 
 
+# Sensitive file globs, translated once into a single alternation
+SENSITIVE_FILE_PATTERNS = (
+    "*.env", "*.key", "*.pem", "*.crt", ".git/config",
+    "**/secrets/**", "**/.ssh/**", "**/credentials*",
+)
+_SENSITIVE_FILE_RE = re.compile(
+    "|".join(fnmatch.translate(p) for p in SENSITIVE_FILE_PATTERNS)
+)
+
+
+@functools.lru_cache(maxsize=1024)
 def classify_file_operation(operation: str, path: str) -> str:
     """Classify file operation sensitivity."""
     # Read operations are generally safe
@@ -119,13 +157,8 @@ def classify_file_operation(operation: str, path: str) -> str:
     # Write operations need more scrutiny
     if operation == "edit_file":
         # Check for sensitive file patterns
-        sensitive_patterns = [
-            "*.env", "*.key", "*.pem", "*.crt", ".git/config",
-            "**/secrets/**", "**/.ssh/**", "**/credentials*"
-        ]
-        for pattern in sensitive_patterns:
-            if fnmatch.fnmatch(path, pattern):
-                return SensitivityLevel.HIGH
+        if _SENSITIVE_FILE_RE.match(path):
+            return SensitivityLevel.HIGH
         return SensitivityLevel.PROMPT
     
     return SensitivityLevel.AUTO
@@ -133,6 +166,13 @@ def classify_file_operation(operation: str, path: str) -> str:
 
 # --- Tool Implementation ---
 
+# Rule between a read_file header and its content
+_SEPARATOR = "=" * 40
+
+# Size units by power of 1024
+_SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
+
 class SystemGatewayTool(Tool):
     """
     System Gateway Tool for sandboxed filesystem and command execution.
@@ -148,6 +188,14 @@ class SystemGatewayTool(Tool):
     description = "Sandboxed filesystem and command execution"
     simple_description = "reads files and runs commands"
 
+    # Operation name -> handler method name
+    _OPERATION_HANDLERS = {
+        "read_structure": "_read_structure",
+        "read_file": "_read_file",
+        "edit_file": "_edit_file",
+        "execute": "_execute",
+    }
+
     def __init__(self):
         super().__init__()
         self.logger = logging.getLogger(__name__)
@@ -166,6 +214,18 @@ class SystemGatewayTool(Tool):
             "blocked_patterns": cfg.blocked_patterns,
         }
 
+    @functools.cached_property
+    def _audit(self):
+        """Gateway audit logger, resolved on first use."""
+        from services.gateway_audit_log import get_audit_logger
+        return get_audit_logger()
+
+    @functools.cached_property
+    def _hitl(self):
+        """HITL approval service, resolved on first use."""
+        from services.hitl_approval_service import get_hitl_service
+        return get_hitl_service()
+
     @property
     def input_schema(self) -> Dict[str, Any]:
         """Define tool input schema."""
@@ -233,21 +293,13 @@ class SystemGatewayTool(Tool):
         """Execute the requested operation."""
         operation = kwargs.get("operation")
 
-        if operation == "read_structure":
-            return await self._read_structure(kwargs)
-        elif operation == "read_file":
-            return await self._read_file(kwargs)
-        elif operation == "edit_file":
-            return await self._edit_file(kwargs)
-        elif operation == "execute":
-            return await self._execute(kwargs)
-        else:
+        handler = self._OPERATION_HANDLERS.get(operation)
+        if handler is None:
             return f"Unknown operation: {operation}"
+        return await getattr(self, handler)(kwargs)
 
     async def _read_structure(self, params: Dict[str, Any]) -> str:
         """Get directory structure."""
-        from services.gateway_audit_log import get_audit_logger
-
         path = params.get("path", "")
         depth = params.get("depth", 2)
 
@@ -258,7 +310,7 @@ class SystemGatewayTool(Tool):
         })
 
         success = response.get("success", False)
-        get_audit_logger().log_read_structure(self.user_id, path, success)
+        self._audit.log_read_structure(self.user_id, path, success)
 
         if not success:
             return f"Error: {response.get('detail', 'Unknown error')}"
@@ -267,25 +319,22 @@ class SystemGatewayTool(Tool):
         tree = response.get("tree", [])
         stats = response.get("stats", {})
 
-        lines = [f"Directory: {response.get('root', path)}"]
-        lines.append(f"({stats.get('total_files', 0)} files, {stats.get('total_dirs', 0)} directories)")
-        lines.append("")
-
-        for entry in tree[:100]:  # Limit output
-            prefix = "📁 " if entry.get("type") == "dir" else "📄 "
-            size = entry.get("size", "")
-            size_str = f" ({self._format_size(size)})" if size else ""
-            lines.append(f"{prefix}{entry.get('path', '')}{size_str}")
-
-        if len(tree) > 100:
-            lines.append(f"... and {len(tree) - 100} more entries")
+        header = (
+            f"Directory: {response.get('root', path)}\n"
+            f"({stats.get('total_files', 0)} files, {stats.get('total_dirs', 0)} directories)\n"
+        )
+        body = "\n".join(
+            f"{'📁 ' if entry.get('type') == 'dir' else '📄 '}{entry.get('path', '')}"
+            f"{f' ({self._format_size(size)})' if (size := entry.get('size')) else ''}"
+            for entry in islice(tree, 100)  # Limit output
+        )
+        remaining = len(tree) - 100
+        footer = f"\n... and {remaining} more entries" if remaining > 0 else ""
 
-        return "\n".join(lines)
+        return f"{header}\n{body}{footer}" if body else header
 
     async def _read_file(self, params: Dict[str, Any]) -> str:
         """Read file contents."""
-        from services.gateway_audit_log import get_audit_logger
-
         path = params.get("path")
         if not path:
             return "Error: path is required for read_file"
@@ -298,7 +347,7 @@ class SystemGatewayTool(Tool):
 
         success = response.get("success", False)
         lines_returned = response.get("lines_returned", 0)
-        get_audit_logger().log_read_file(self.user_id, path, success, lines_returned)
+        self._audit.log_read_file(self.user_id, path, success, lines_returned)
 
         if not success:
             return f"Error: {response.get('detail', 'Unknown error')}"
@@ -314,12 +363,10 @@ class SystemGatewayTool(Tool):
         if truncated:
             header += " [truncated]"
 
-        return f"{header}\n{'=' * 40}\n{content}"
+        return f"{header}\n{_SEPARATOR}\n{content}"
 
     async def _edit_file(self, params: Dict[str, Any]) -> str:
         """Edit file with atomic operations."""
-        from services.gateway_audit_log import get_audit_logger
-
         path = params.get("path")
         edits = params.get("edits")
 
@@ -331,7 +378,7 @@ class SystemGatewayTool(Tool):
         # Check sensitivity and get approval if needed
         sensitivity = classify_file_operation("edit_file", path)
         if sensitivity == SensitivityLevel.BLOCKED:
-            get_audit_logger().log_blocked(self.user_id, "edit_file", path, "blocked pattern")
+            self._audit.log_blocked(self.user_id, "edit_file", path, "blocked pattern")
             return f"Error: Editing this file is blocked: {path}"
 
         if sensitivity in (SensitivityLevel.PROMPT, SensitivityLevel.HIGH):
@@ -351,7 +398,7 @@ class SystemGatewayTool(Tool):
 
         success = response.get("success", False)
         applied = response.get("edits_applied", 0)
-        get_audit_logger().log_edit_file(self.user_id, path, success, applied)
+        self._audit.log_edit_file(self.user_id, path, success, applied)
 
         if not success:
             return f"Error: {response.get('detail', 'Unknown error')}"
@@ -363,8 +410,6 @@ class SystemGatewayTool(Tool):
 
     async def _execute(self, params: Dict[str, Any]) -> str:
         """Execute shell command."""
-        from services.gateway_audit_log import get_audit_logger
-
         command = params.get("command")
         if not command:
             return "Error: command is required for execute"
@@ -373,7 +418,7 @@ class SystemGatewayTool(Tool):
         sensitivity = classify_command(command)
 
         if sensitivity == SensitivityLevel.BLOCKED:
-            get_audit_logger().log_blocked(self.user_id, "execute", command, "blocked command")
+            self._audit.log_blocked(self.user_id, "execute", command, "blocked command")
             return f"Error: Command blocked for security: {command}"
 
         if sensitivity in (SensitivityLevel.PROMPT, SensitivityLevel.HIGH):
@@ -398,7 +443,7 @@ class SystemGatewayTool(Tool):
         })
 
         if "detail" in response and not response.get("success", True):
-            get_audit_logger().log_execute(self.user_id, command, False, -1, 0)
+            self._audit.log_execute(self.user_id, command, False, -1, 0)
             return f"Error: {response.get('detail')}"
 
         exit_code = response.get("exit_code", -1)
@@ -408,23 +453,17 @@ class SystemGatewayTool(Tool):
         truncated = response.get("truncated", False)
 
         success = exit_code == 0
-        get_audit_logger().log_execute(self.user_id, command, success, exit_code, duration)
+        self._audit.log_execute(self.user_id, command, success, exit_code, duration)
 
-        lines = [f"Command: {command}"]
-        lines.append(f"Exit code: {exit_code} ({duration}ms)")
+        truncated_str = "\n[Output truncated]" if truncated else ""
+        stdout_str = f"\n\n--- stdout ---\n{stdout}" if stdout else ""
+        stderr_str = f"\n\n--- stderr ---\n{stderr}" if stderr else ""
 
-        if truncated:
-            lines.append("[Output truncated]")
-
-        if stdout:
-            lines.append("\n--- stdout ---")
-            lines.append(stdout)
-
-        if stderr:
-            lines.append("\n--- stderr ---")
-            lines.append(stderr)
-
-        return "\n".join(lines)
+        return (
+            f"Command: {command}\n"
+            f"Exit code: {exit_code} ({duration}ms)"
+            f"{truncated_str}{stdout_str}{stderr_str}"
+        )
 
     async def _gateway_request(
         self,
@@ -453,9 +492,9 @@ class SystemGatewayTool(Tool):
         sensitivity: str
     ) -> bool:
         """Request HITL approval for sensitive operation."""
-        from services.hitl_approval_service import get_hitl_service, ApprovalStatus
+        from services.hitl_approval_service import ApprovalStatus
 
-        service = get_hitl_service()
+        service = self._hitl
 
         # Queue the approval request
         request = await service.queue_approval(
@@ -492,9 +531,6 @@ class SystemGatewayTool(Tool):
         """Format file size for display."""
         if not size:
             return ""
-        for unit in ["B", "KB", "MB", "GB"]:
-            if size < 1024:
-                return f"{size:.1f}{unit}"
-            size /= 1024
-        return f"{size:.1f}TB"
+        k = min((size.bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+        return f"{size / (1 << (10 * k)):.1f}{_SIZE_UNITS[k]}"
 
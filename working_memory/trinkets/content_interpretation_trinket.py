@@ -9,9 +9,9 @@ This addresses the "Source ≠ Substance" problem: LLMs pattern-match on sender/
 metadata and assume content type, then describe through that lens without verification.
 Example: Vendor email assumed to be transaction when it's actually a newsletter.
 """
-import json
 import logging
-from typing import Dict, Any, List, Set
+from itertools import islice
+from typing import Dict, Any, FrozenSet, List, Optional, Set, Tuple
 
 from .base import EventAwareTrinket
 
@@ -19,13 +19,51 @@ logger = logging.getLogger(__name__)
 
 
 # Tools whose results may require content interpretation
-CONTENT_INTERPRETATION_TOOLS: Set[str] = {
+CONTENT_INTERPRETATION_TOOLS: FrozenSet[str] = frozenset({
     "email_tool",
     "web_tool",
     "document_tool",
     "file_tool",
+})
+
+# Per-tool (content type, key distinction) hints, in prompt order
+_TOOL_HINTS: Dict[str, Tuple[str, str]] = {
+    "email_tool": ("email", "transactional vs. promotional/newsletter"),
+    "web_tool": ("web content", "primary content vs. ads/navigation"),
+    "document_tool": ("document", "document type based on content, not filename"),
+    "file_tool": ("document", "document type based on content, not filename"),
 }
 
+# Interpretation protocol; {content_types} and {key_distinctions} are filled per activation
+_PROTOCOL_TEMPLATE = """<content_interpretation_protocol>
+<context>You recently retrieved {content_types} that requires careful interpretation.
+Source metadata (sender, domain, filename) may not indicate actual content type.</context>
+
+<verify_before_describe>
+Before describing any item's content:
+1. OBSERVE: Note the source/sender/metadata
+2. ASSUME: State what type you'd initially expect from this source
+3. VERIFY: Check if actual content matches that expectation
+4. CLASSIFY: Determine what the content actually IS based on substance
+5. FLAG: If assumption ≠ reality, note the mismatch explicitly
+</verify_before_describe>
+
+<key_distinctions>{key_distinctions}</key_distinctions>
+
+<common_mismatches>
+- Familiar brand sender + promotional content (not a transaction)
+- Official-looking source + marketing material (not account action required)
+- Personal name + forwarded/automated content (not direct message)
+- Professional filename + informal/draft content (not final document)
+</common_mismatches>
+
+<output_format>
+For each item, output classification before description:
+[VERIFIED: {{type}}] Description based on verified content...
+[MISMATCH: expected {{X}}, actually {{Y}}] Description noting the discrepancy...
+</output_format>
+</content_interpretation_protocol>"""
+
 
 class ContentInterpretationTrinket(EventAwareTrinket):
     """
@@ -54,6 +92,9 @@ class ContentInterpretationTrinket(EventAwareTrinket):
         self.current_turn = 0
         self.ttl_turns = 2  # Deactivate after N turns without relevant tool calls
 
+        # Rendered protocol for the current active_context; reset when it changes
+        self._cached_content: Optional[str] = None
+
         # Subscribe to turn completion to check for content-interpretation tools
         self.event_bus.subscribe('TurnCompletedEvent', self._handle_turn_completed)
         logger.info("ContentInterpretationTrinket subscribed to TurnCompletedEvent")
@@ -77,6 +118,7 @@ class ContentInterpretationTrinket(EventAwareTrinket):
             self.active = True
             self.activation_turn = self.current_turn
             self.active_context = self._build_context_hints(tools_used)
+            self._cached_content = None
             logger.info(
                 f"ContentInterpretationTrinket activated at turn {self.current_turn} "
                 f"for tools: {tools_used}"
@@ -84,6 +126,7 @@ class ContentInterpretationTrinket(EventAwareTrinket):
         elif self.active and (self.current_turn - self.activation_turn) >= self.ttl_turns:
             self.active = False
             self.active_context = {}
+            self._cached_content = None
             logger.debug(
                 f"ContentInterpretationTrinket deactivated after {self.ttl_turns} turns"
             )
@@ -94,83 +137,58 @@ class ContentInterpretationTrinket(EventAwareTrinket):
 
         Scans recent messages for tool results from content-interpretation tools.
         """
-        tools_found = []
-
-        # Check recent messages (last 10 should be enough for a single turn)
-        recent_messages = continuum.messages[-10:] if continuum.messages else []
+        tools_found: Set[str] = set()
 
-        for msg in recent_messages:
+        # Walk back from the newest message; the user message opens the turn,
+        # and 10 messages is a safety cap for unusually long turns
+        for msg in islice(reversed(continuum.messages or ()), 10):
+            if msg.role == "user":
+                break
             # Check assistant messages for tool calls
             if msg.role == "assistant" and msg.metadata.get("has_tool_calls"):
-                tool_calls = msg.metadata.get("tool_calls", [])
+                tool_calls = msg.metadata.get("tool_calls", ())
                 for tc in tool_calls:
                     tool_name = tc.get("name", "")
                     if tool_name in CONTENT_INTERPRETATION_TOOLS:
-                        tools_found.append(tool_name)
+                        tools_found.add(tool_name)
+                if len(tools_found) == len(CONTENT_INTERPRETATION_TOOLS):
+                    break
 
-        return list(set(tools_found))  # Deduplicate
+        return list(tools_found)
 
     def _build_context_hints(self, tools_used: List[str]) -> Dict[str, Any]:
         """Build context hints based on which tools were used."""
-        hints: Dict[str, Any] = {"tools": tools_used}
+        content_types: List[str] = []
+        key_distinctions: List[str] = []
 
-        # Add tool-specific hints
-        if "email_tool" in tools_used:
-            hints["content_types"] = hints.get("content_types", []) + ["email"]
-            hints["key_distinctions"] = hints.get("key_distinctions", []) + [
-                "transactional vs. promotional/newsletter"
-            ]
+        # Add tool-specific hints (tools sharing a content type contribute it once)
+        for tool_name, (content_type, distinction) in _TOOL_HINTS.items():
+            if tool_name in tools_used and content_type not in content_types:
+                content_types.append(content_type)
+                key_distinctions.append(distinction)
 
-        if "web_tool" in tools_used:
-            hints["content_types"] = hints.get("content_types", []) + ["web content"]
-            hints["key_distinctions"] = hints.get("key_distinctions", []) + [
-                "primary content vs. ads/navigation"
-            ]
-
-        if "document_tool" in tools_used or "file_tool" in tools_used:
-            hints["content_types"] = hints.get("content_types", []) + ["document"]
-            hints["key_distinctions"] = hints.get("key_distinctions", []) + [
-                "document type based on content, not filename"
-            ]
-
-        return hints
+        return {
+            "tools": tools_used,
+            "content_types": content_types,
+            "key_distinctions": key_distinctions,
+        }
 
     def generate_content(self, context: Dict[str, Any]) -> str:
         """Generate interpretation protocol if active."""
         if not self.active:
             return ""
 
+        if self._cached_content is not None:
+            return self._cached_content
+
         content_types = ", ".join(self.active_context.get("content_types", ["content"]))
         key_distinctions = "; ".join(
             self.active_context.get("key_distinctions", ["content type"])
         )
 
-        return f"""<content_interpretation_protocol>
-<context>You recently retrieved {content_types} that requires careful interpretation.
-Source metadata (sender, domain, filename) may not indicate actual content type.</context>
-
-<verify_before_describe>
-Before describing any item's content:
-1. OBSERVE: Note the source/sender/metadata
-2. ASSUME: State what type you'd initially expect from this source
-3. VERIFY: Check if actual content matches that expectation
-4. CLASSIFY: Determine what the content actually IS based on substance
-5. FLAG: If assumption ≠ reality, note the mismatch explicitly
-</verify_before_describe>
-
-<key_distinctions>{key_distinctions}</key_distinctions>
-
-<common_mismatches>
-- Familiar brand sender + promotional content (not a transaction)
-- Official-looking source + marketing material (not account action required)
-- Personal name + forwarded/automated content (not direct message)
-- Professional filename + informal/draft content (not final document)
-</common_mismatches>
-
-<output_format>
-For each item, output classification before description:
-[VERIFIED: {{type}}] Description based on verified content...
-[MISMATCH: expected {{X}}, actually {{Y}}] Description noting the discrepancy...
-</output_format>
-</content_interpretation_protocol>"""
+        self._cached_content = _PROTOCOL_TEMPLATE.format_map({
+            "content_types": content_types,
+            "key_distinctions": key_distinctions,
+        })
+        return self._cached_content
 
@@ -1,5 +1,11 @@
 """Punchclock trinket for working memory."""
+import functools
+import heapq
+import html
+import io
 import logging
+import operator
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
@@ -13,11 +19,76 @@ logger = logging.getLogger(__name__)
 
 # UTC-aware minimum datetime for sort fallbacks (avoids naive datetime.min)
 _UTC_MIN_ISO = datetime.min.replace(tzinfo=timezone.utc).isoformat()
+_completed_at_key = operator.attrgetter("completed_at")
+
+# Session fields the rendered output depends on
+_RENDER_FIELDS = (
+    "id", "status", "label", "notes", "total_seconds", "active_segment_start",
+    "first_started_at", "paused_at", "completed_at",
+)
+
+
+@dataclass(slots=True)
+class _AugmentedSession:
+    """Render-time fields overlaid on a raw session dict (which is not copied)."""
+    session: Dict[str, Any]
+    label: str  # Escaped for attribute use
+    notes: Optional[str]  # Stripped and escaped; None when the session has no notes
+    total_seconds: float
+    elapsed_human: str
+    first_started_local: Optional[str] = None
+    paused_local: Optional[str] = None
+    completed_local: Optional[str] = None
+    completed_at: str = _UTC_MIN_ISO  # Sort key for completed sessions
+
+
+# Session timestamps are immutable ISO strings, so parsed values are safe to reuse
+@functools.lru_cache(maxsize=2048)
+def _parse_cached(value: str) -> Optional[datetime]:
+    try:
+        return parse_utc_time_string(value)
+    except ValueError:
+        return None
+
+
+# Segment starts are fixed while a session runs; the epoch avoids a timedelta per render
+@functools.lru_cache(maxsize=2048)
+def _start_epoch(value: str) -> Optional[float]:
+    dt = _parse_cached(value)
+    return dt.timestamp() if dt else None
+
+
+# Labels and notes rarely change between renders, so escapes are reused
+@functools.lru_cache(maxsize=4096)
+def _esc(value: str) -> str:
+    return html.escape(value, quote=True)
+
+
+# Keyed on whole seconds so paused/completed sessions reuse their string across renders
+@functools.lru_cache(maxsize=4096)
+def _format_duration(seconds: int) -> str:
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    parts: List[str] = []
+    if hours:
+        parts.append(f"{hours}h")
+    if minutes:
+        parts.append(f"{minutes}m")
+    if secs or not parts:
+        parts.append(f"{secs}s")
+    return " ".join(parts)
 
 
 class PunchclockTrinket(EventAwareTrinket):
     """Expose active punchclock sessions inside the system prompt."""
 
+    def __init__(self, event_bus, working_memory):
+        super().__init__(event_bus, working_memory)
+
+        # Last rendered output and the inputs it was rendered from
+        self._last_key: Optional[tuple] = None
+        self._last_output = ""
+
     def _get_variable_name(self) -> str:
         return "punchclock_status"
 
@@ -38,45 +109,69 @@ class PunchclockTrinket(EventAwareTrinket):
             logger.debug("User timezone not configured, using UTC")
             user_tz = "UTC"
 
-        running, paused, completed = self._partition_sessions(sessions, now)
+        key = self._render_key(sessions, now, user_tz)
+        if key == self._last_key:
+            return self._last_output
+
+        output = self._render(sessions, now, user_tz)
+        self._last_key = key
+        self._last_output = output
+        return output
+
+    def _render_key(
+        self, sessions: List[Dict[str, Any]], now: datetime, tz: str
+    ) -> tuple:
+        fields = tuple(tuple(map(session.get, _RENDER_FIELDS)) for session in sessions)
+        # Running timers render elapsed seconds, so output then also depends on the clock
+        has_running = any(session.get("status") == "running" for session in sessions)
+        clock = now.replace(microsecond=0) if has_running else None
+        return (tz, clock, fields)
+
+    def _render(self, sessions: List[Dict[str, Any]], now: datetime, user_tz: str) -> str:
+        running, paused, completed = self._partition_sessions(sessions, now, user_tz)
 
         if not running and not paused and not completed:
             return ""
 
-        content_lines: List[str] = ["<punchclock>"]
+        buf = io.StringIO()
+        buf.write("<punchclock>\n")
 
         if running:
-            content_lines.append("<running_sessions>")
+            buf.write("<running_sessions>\n")
             for item in running:
-                content_lines.append(self._format_running_entry(item, user_tz))
-            content_lines.append("</running_sessions>")
+                buf.write(self._format_running_entry(item))
+                buf.write("\n")
+            buf.write("</running_sessions>\n")
 
         if paused:
-            content_lines.append("<paused_sessions>")
+            buf.write("<paused_sessions>\n")
             for item in paused:
-                content_lines.append(self._format_paused_entry(item, user_tz))
-            content_lines.append("</paused_sessions>")
+                buf.write(self._format_paused_entry(item))
+                buf.write("\n")
+            buf.write("</paused_sessions>\n")
 
         if completed:
-            content_lines.append("<recently_completed>")
-            for item in completed[:3]:
-                content_lines.append(self._format_completed_entry(item, user_tz))
-            content_lines.append("</recently_completed>")
+            buf.write("<recently_completed>\n")
+            for item in completed:
+                buf.write(self._format_completed_entry(item))
+                buf.write("\n")
+            buf.write("</recently_completed>\n")
 
-        content_lines.append("</punchclock>")
-        return "\n".join(content_lines)
+        buf.write("</punchclock>")
+        return buf.getvalue()
 
     # Formatting helpers ---------------------------------------------------------
     def _partition_sessions(
-        self, sessions: List[Dict[str, Any]], now: datetime
-    ) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
-        running: List[Dict[str, Any]] = []
-        paused: List[Dict[str, Any]] = []
-        completed: List[Dict[str, Any]] = []
+        self, sessions: List[Dict[str, Any]], now: datetime, tz: str
+    ) -> tuple[List[_AugmentedSession], List[_AugmentedSession], List[_AugmentedSession]]:
+        running: List[_AugmentedSession] = []
+        paused: List[_AugmentedSession] = []
+        completed: List[_AugmentedSession] = []
+        now_epoch = now.timestamp()
 
         for session in sessions:
             status = session.get("status")
-            item = self._augment_session(session, now)
+            item = self._augment_session(session, now_epoch, tz)
             if status == "running":
                 running.append(item)
             elif status == "paused":
@@ -84,76 +179,79 @@ class PunchclockTrinket(EventAwareTrinket):
             elif status == "completed":
                 completed.append(item)
 
-        completed.sort(
-            key=lambda item: item.get("completed_at") or _UTC_MIN_ISO,
-            reverse=True,
-        )
+        # Only the three most recent completions are rendered
+        recent_completed = heapq.nlargest(3, completed, key=_completed_at_key)
 
-        return running, paused, completed
+        return running, paused, recent_completed
 
-    def _augment_session(self, session: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    def _augment_session(
+        self, session: Dict[str, Any], now_epoch: float, tz: str
+    ) -> _AugmentedSession:
         total_seconds = float(session.get("total_seconds", 0.0))
-        augmented = dict(session)
 
         status = session.get("status")
         active_start = session.get("active_segment_start")
         if status == "running" and active_start:
-            start_dt = self._safe_fromiso(active_start)
-            if start_dt:
-                total_seconds += max(0.0, (now - start_dt).total_seconds())
+            start_epoch = _start_epoch(active_start)
+            if start_epoch is not None:
+                total_seconds += max(0.0, now_epoch - start_epoch)
+
+        augmented = _AugmentedSession(
+            session=session,
+            label=_esc(session.get("label") or "Unnamed session"),
+            notes=_esc(notes.strip()) if (notes := session.get("notes")) else None,
+            total_seconds=total_seconds,
+            elapsed_human=_format_duration(max(0, int(round(total_seconds)))),
+        )
 
-        augmented["total_seconds"] = total_seconds
-        augmented["elapsed_human"] = self._format_duration(total_seconds)
+        # Localize only the timestamps this status's formatter renders
+        if status in ("running", "completed"):
+            augmented.first_started_local = self._format_local(
+                session.get("first_started_at"), tz
+            )
+        if status == "paused":
+            augmented.paused_local = self._format_local(session.get("paused_at"), tz)
+        elif status == "completed":
+            augmented.completed_local = self._format_local(session.get("completed_at"), tz)
+            # Fill the sort key once so ordering can use a plain attrgetter
+            augmented.completed_at = session.get("completed_at") or _UTC_MIN_ISO
         return augmented
 
-    def _format_running_entry(self, session: Dict[str, Any], tz: str) -> str:
-        label = session.get("label", "Unnamed session")
-        start_text = self._format_local(session.get("first_started_at"), tz)
-        elapsed = session.get("elapsed_human", "0s")
-        short_id = self._short_id(session.get("id"))
-
-        # Build attributes
-        attrs = [f'id="{short_id}"', f'label="{label}"', f'elapsed="{elapsed}"']
-        if start_text:
-            attrs.append(f'started="{start_text}"')
-
-        notes = session.get("notes")
-        if notes:
-            return f"<session {' '.join(attrs)}>\n<notes>{notes.strip()}</notes>\n</session>"
-        return f"<session {' '.join(attrs)}/>"
-
-    def _format_paused_entry(self, session: Dict[str, Any], tz: str) -> str:
-        label = session.get("label", "Unnamed session")
-        paused_text = self._format_local(session.get("paused_at"), tz)
-        elapsed = session.get("elapsed_human", "0s")
-        short_id = self._short_id(session.get("id"))
-
-        # Build attributes
-        attrs = [f'id="{short_id}"', f'label="{label}"', f'total="{elapsed}"']
-        if paused_text:
-            attrs.append(f'paused_at="{paused_text}"')
-
-        notes = session.get("notes")
-        if notes:
-            return f"<session {' '.join(attrs)}>\n<notes>{notes.strip()}</notes>\n</session>"
-        return f"<session {' '.join(attrs)}/>"
-
-    def _format_completed_entry(self, session: Dict[str, Any], tz: str) -> str:
-        label = session.get("label", "Unnamed session")
-        start_text = self._format_local(session.get("first_started_at"), tz)
-        end_text = self._format_local(session.get("completed_at"), tz)
-        elapsed = session.get("elapsed_human", "0s")
-        short_id = self._short_id(session.get("id"))
-
-        # Build attributes
-        attrs = [f'id="{short_id}"', f'label="{label}"', f'duration="{elapsed}"']
-        if start_text and end_text:
-            attrs.append(f'window="{start_text} - {end_text}"')
-
-        notes = session.get("notes")
-        if notes:
-            return f"<session {' '.join(attrs)}>\n<notes>{notes.strip()}</notes>\n</session>"
-        return f"<session {' '.join(attrs)}/>"
+    def _format_running_entry(self, aug: _AugmentedSession) -> str:
+        start_text = aug.first_started_local
+        short_id = self._short_id(aug.session.get("id"))
+
+        started = f' started="{start_text}"' if start_text else ""
+        return self._session_element(
+            f'id="{short_id}" label="{aug.label}" elapsed="{aug.elapsed_human}"{started}',
+            aug.notes,
+        )
+
+    def _format_paused_entry(self, aug: _AugmentedSession) -> str:
+        paused_text = aug.paused_local
+        short_id = self._short_id(aug.session.get("id"))
+
+        paused_at = f' paused_at="{paused_text}"' if paused_text else ""
+        return self._session_element(
+            f'id="{short_id}" label="{aug.label}" total="{aug.elapsed_human}"{paused_at}',
+            aug.notes,
+        )
+
+    def _format_completed_entry(self, aug: _AugmentedSession) -> str:
+        start_text, end_text = aug.first_started_local, aug.completed_local
+        short_id = self._short_id(aug.session.get("id"))
+
+        window = f' window="{start_text} - {end_text}"' if start_text and end_text else ""
+        return self._session_element(
+            f'id="{short_id}" label="{aug.label}" duration="{aug.elapsed_human}"{window}',
+            aug.notes,
+        )
+
+    @staticmethod
+    def _session_element(attrs: str, notes: Optional[str]) -> str:
+        if notes is not None:
+            return f"<session {attrs}>\n<notes>{notes}</notes>\n</session>"
+        return f"<session {attrs}/>"
 
     @staticmethod
     def _short_id(value: Optional[str]) -> str:
@@ -163,12 +261,7 @@ class PunchclockTrinket(EventAwareTrinket):
 
     @staticmethod
     def _safe_fromiso(value: Optional[str]) -> Optional[datetime]:
-        if not value:
-            return None
-        try:
-            return parse_utc_time_string(value)
-        except ValueError:
-            return None
+        return _parse_cached(value) if value else None
 
     def _format_local(self, value: Optional[str], tz: str) -> Optional[str]:
         dt = self._safe_fromiso(value)
@@ -176,17 +269,3 @@ class PunchclockTrinket(EventAwareTrinket):
             return None
         local_dt = convert_from_utc(dt, tz)
         return format_datetime(local_dt, "date_time_short", tz_name=None, include_timezone=False)
-
-    @staticmethod
-    def _format_duration(total_seconds: float) -> str:
-        seconds = max(0, int(round(total_seconds)))
-        hours, remainder = divmod(seconds, 3600)
-        minutes, secs = divmod(remainder, 60)
-        parts: List[str] = []
-        if hours:
-            parts.append(f"{hours}h")
-        if minutes:
-            parts.append(f"{minutes}m")
-        if secs or not parts:
-            parts.append(f"{secs}s")
-        return " ".join(parts)